@@ -1,15 +1,28 @@
 # -------------------------------------------------------------------------------------------------
 # Imports
 # -------------------------------------------------------------------------------------------------
+import json
 import logging
+import os
+import signal
+import sys
 import time
 from datetime import datetime as dt
 # import config as env
+from artifacts import ArtifactWriter
+from async_runner import TRANSIENT_ERRORS, AsyncBatchRunner
+from browser import DEFAULT_PROFILE, DriverPool
+from daemon import FormDaemon
+from direct_submit import DirectSubmitter, FormLayoutChanged
+from functools import partial
 from general import GeneralUtil as gen_util
-from selenium import webdriver
+from journal import JOURNAL_FP, SubmissionJournal
+from locators import FormElement, LocatorRegistry
+from scheduler import FormScheduler
+from timing import SpanRecorder
+from waits import PageWaiter
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 # level = logging.INFO
 # fmt = "[%(levelname)s] %(asctime)s - %(message)s"
 # logging.basicConfig(
@@ -18,25 +31,86 @@ from selenium.webdriver.chrome.service import Service
 #     format=fmt,
 # )
 
-import chromedriver_autoinstaller
-from pyvirtualdisplay import Display
-display = Display(visible=0, size=(800, 800))  
-display.start()
-
-chromedriver_autoinstaller.install()  # Check if the current version of chromedriver exists
-                                      # and if it doesn't exist, download it automatically,
-                                      # then add chromedriver to path
-
-chrome_options = Options()
-chrome_options.add_argument("-incognito")
-chrome_options.add_argument("--headless")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+# Chrome options live in browser.PROFILES, pick one with CHROME_PROFILE. chromedriver is looked up
+# once per Chrome version and cached in CHROMEDRIVER_DIR.
+if not DEFAULT_PROFILE.headless:
+    # Headless profiles do not need an X server, so only pay for Xvfb when a window is shown.
+    from pyvirtualdisplay import Display
+    display = Display(visible=0, size=(800, 800))
+    display.start()
 
 logging.info("Running main.py\n")
 
 today_ = dt.now().strftime("%B %d, %H:%M:%S")
 ids = ["210072", "210071", "210029", "210143"]
 reference_name = "Makai"
+FORM_URL = os.environ.get(
+    "FORM_URL",
+    "https://docs.google.com/forms/d/e/1FAIpQLSf7LSpENMM8nB_YBcDUqgUQFbYNrGwKyIUndz54Fp-U-8ZdwA/viewform?usp=sf_link",
+)
+POOL_SIZE = int(os.environ.get("POOL_SIZE", 1))  # Number of browsers submitting in parallel.
+WAIT_TIMEOUT = float(os.environ.get("WAIT_TIMEOUT", 10))
+WAIT_POLL = float(os.environ.get("WAIT_POLL", 0.1))
+# "direct" posts the form over HTTP and only falls back to the browser if the form layout changed.
+SUBMIT_MODE = os.environ.get("SUBMIT_MODE", "browser")
+DIRECT_ANSWERS = ["{student_id}", 0, 0]  # Student ID, first attendance option, first duration option.
+# JSON list of {"url": ..., "ids": [...], "reference_name": ...} jobs to run in one go instead of `ids`.
+JOBS_FILE = os.environ.get("JOBS_FILE")
+RATE_LIMIT = float(os.environ.get("RATE_LIMIT", 1))  # Submissions per second per form host.
+JOBS_TIMEOUT = float(os.environ.get("JOBS_TIMEOUT", 1800))
+# Where to write per-phase and per-ID timings at the end of the run: *.prom for a Prometheus
+# textfile, anything else is appended to as JSON lines.
+TIMINGS_FILE = os.environ.get("TIMINGS_FILE")
+TIMINGS = SpanRecorder()
+# Outcome of every submission, so a rerun only submits IDs that did not succeed yet in the batch.
+# A batch is a strftime format of the run time, by default one submission per ID per day.
+JOURNAL_FILE = os.environ.get("JOURNAL_FILE", JOURNAL_FP)
+JOURNAL_BATCH = os.environ.get("JOURNAL_BATCH", "%Y-%m-%d")
+# Screenshots and page HTML, written off the browser threads to ARTIFACTS_DIR. ARTIFACTS_ON picks
+# when: "failure" and/or "submit"; ARTIFACTS_EVERY=N also samples every N-th submission.
+ARTIFACTS_ON = os.environ.get("ARTIFACTS_ON", "failure").split(",")
+ARTIFACTS = ArtifactWriter(
+    os.environ.get("ARTIFACTS_DIR", "artifacts"),
+    on_failure="failure" in ARTIFACTS_ON,
+    after_submit="submit" in ARTIFACTS_ON,
+    every_n=int(os.environ.get("ARTIFACTS_EVERY", 0)),
+    kinds=os.environ.get("ARTIFACTS_KINDS", "screenshot,html").split(","),
+)
+# With --daemon the script stays up with Chrome warm and takes jobs from these, see daemon.py.
+DAEMON_DIR = os.environ.get("DAEMON_DIR")
+DAEMON_SOCKET = os.environ.get("DAEMON_SOCKET", "/tmp/forms.sock")
+
+# Form elements. Candidates are tried in order: CSS selectors matching the same element as the
+# XPath after them, the older XPaths, and last selectors for plain HTML copies of the form such
+# as fake_form_server.py. The one that worked last is remembered per form in .locator_cache.json.
+LOCATORS = LocatorRegistry([
+    FormElement("textbox", (
+        (By.CSS_SELECTOR, (
+            '[id="mG61Hd"] > div:nth-of-type(2) > div > div:nth-of-type(2) > div:nth-of-type(1) > div > div'
+            ' > div:nth-of-type(2) > div > div:nth-of-type(1) > div > div:nth-of-type(1) > input'
+        )),
+        (By.XPATH, '//*[@id="mG61Hd"]/div[2]/div/div[2]/div[1]/div/div/div[2]/div/div[1]/div/div[1]/input'),
+        (By.CSS_SELECTOR, 'form input[type="text"]'),
+    )),
+    FormElement("attendance", (
+        (By.CSS_SELECTOR, 'div[class="vd3tt"] div'),
+        (By.XPATH, "(//div[@class='vd3tt']//div)[1]"),
+        (By.XPATH, '/html/body/div/div[3]/form/div[2]/div/div[2]/div[2]/div/div/div[2]/div/div/span/div/div[1]/label/div/div[1]/div/div[3]/div'),
+        (By.CSS_SELECTOR, 'fieldset:nth-of-type(1) input[type="radio"]'),
+    ), clickable=True),
+    FormElement("duration", (
+        (By.CSS_SELECTOR, 'div[id="i31"] > div:nth-of-type(3) > div:nth-of-type(1)'),
+        (By.XPATH, "//div[@id='i31']/div[3]/div[1]"),
+        (By.XPATH, '/html/body/div/div[3]/form/div[2]/div/div[2]/div[3]/div/div/div[2]/div/div/span/div/div[1]/label/div/div[1]/div/div[3]/div'),
+        (By.CSS_SELECTOR, 'fieldset:nth-of-type(2) input[type="radio"]'),
+    ), clickable=True),
+    FormElement("submit", (
+        # Matching on text has no CSS equivalent.
+        (By.XPATH, "//span[contains(text(),'Submit')]"),
+        (By.XPATH, '/html/body/div/div[3]/form/div[2]/div/div[3]/div[1]/div[1]/div/span/span'),
+        (By.CSS_SELECTOR, 'form button[type="submit"]'),
+    ), clickable=True),
+])
 
 # persons = {
     # 'chris': {
@@ -52,110 +126,214 @@ reference_name = "Makai"
     # }
 # }
 
-def main():
-    def fill_form(student_id, reference_name):
-        """Fill out cultivation sheet
-
-        Parameters
-        ----------
-        id : int
-            student ID
-        reference_name : str
-            person for reference
-        """
-        logging.info(f"Filling out form for {student_id} with {reference_name} as reference")
+def fill_form(driver, student_id, reference_name, url=FORM_URL, spans=TIMINGS, artifacts=ARTIFACTS):
+    """Fill out cultivation sheet
+
+    Parameters
+    ----------
+    driver : webdriver.Chrome
+        Driver borrowed from the DriverPool.
+    id : int
+        student ID
+    reference_name : str
+        person for reference
+    url : str, optional, default FORM_URL
+        Form to fill out. Point it at a file:// URL to run against a local copy of the form.
+    spans : SpanRecorder, optional, default TIMINGS
+        Records one span per phase and a "total" span for the ID.
+    artifacts : ArtifactWriter, optional, default ARTIFACTS
+        Captures the page on failure and after submit, as configured.
+    """
+    logging.info(f"Filling out form for {student_id} with {reference_name} as reference")
+    try:
+        submit_form(driver, student_id, url, spans)
+    except Exception:
+        artifacts.failed(driver, student_id)
+        raise
+    artifacts.submitted(driver, student_id)
+    logging.info("Successfully submitted form\n")
+
+
+def submit_form(driver, student_id, url, spans):
+    """Fill out and submit the form, the part of `fill_form` that is timed."""
+    with spans.span("total", student_id):
         # Open URL
-        chrome_options = webdriver.ChromeOptions()    
-        # Add your options as needed    
-        options = [
-          # Define window size here
-           "--window-size=1200,1200",
-            "--ignore-certificate-errors"
-         
-            #"--headless",
-            #"--disable-gpu",
-            #"--window-size=1920,1200",
-            #"--ignore-certificate-errors",
-            #"--disable-extensions",
-            #"--no-sandbox",
-            #"--disable-dev-shm-usage",
-            #'--remote-debugging-port=9222'
-        ]
-        
-        for option in options:
-            chrome_options.add_argument(option)
-        
-            
-        driver = webdriver.Chrome(options = chrome_options)
-        print(driver)
-        driver.get("https://docs.google.com/forms/d/e/1FAIpQLSf7LSpENMM8nB_YBcDUqgUQFbYNrGwKyIUndz54Fp-U-8ZdwA/viewform?usp=sf_link")
+        with spans.span("page_load", student_id):
+            driver.get(url)
         # driver.get("https://docs.google.com/forms/d/1sjD-62V_m5B6PAf28PiX7K17U8XNyo8vGAjbtiRZ9oI")
 
-        # wait for one second, until page gets fully loaded
-        time.sleep(3)
+        # Wait only as long as the page needs instead of a fixed sleep.
+        waiter = PageWaiter(driver, timeout=WAIT_TIMEOUT, poll_frequency=WAIT_POLL)
+        with spans.span("form_ready", student_id):
+            waiter.form_ready()
+
+        # All elements in one script call, with the locators that worked last time tried first.
+        with spans.span("lookup", student_id):
+            elements = LOCATORS.resolve(waiter, url)
 
         # Select input box
-        textbox = driver.find_elements(By.XPATH, '//*[@id="mG61Hd"]/div[2]/div/div[2]/div[1]/div/div/div[2]/div/div[1]/div/div[1]/input')
-        for box in textbox:
-            box.send_keys(student_id)
-        
+        with spans.span("type:textbox", student_id):
+            elements["textbox"].send_keys(student_id)
+
         # Kind of attendance
-        attendance = driver.find_element(By.XPATH, "(//div[@class='vd3tt']//div)[1]")
-        # attendance = driver.find_element(By.XPATH, '/html/body/div/div[3]/form/div[2]/div/div[2]/div[2]/div/div/div[2]/div/div/span/div/div[1]/label/div/div[1]/div/div[3]/div')
-        attendance.click()
-        
+        with spans.span("click:attendance", student_id):
+            elements["attendance"].click()
+
         # Duration of attendance
-        duration = driver.find_element(By.XPATH, "//div[@id='i31']/div[3]/div[1]")
-        # duration = driver.find_element(By.XPATH, '/html/body/div/div[3]/form/div[2]/div/div[2]/div[3]/div/div/div[2]/div/div/span/div/div[1]/label/div/div[1]/div/div[3]/div')
-        duration.click()
-        
+        with spans.span("click:duration", student_id):
+            elements["duration"].click()
+
         # Click on submit button
-        # submit = driver.find_element(By.XPATH, '/html/body/div/div[3]/form/div[2]/div/div[3]/div[1]/div[1]/div/span/span')
-        submit = driver.find_element(By.XPATH, "//span[contains(text(),'Submit')]")
-        submit.click()
-        # textbox = driver.find_elements_by_xpath(
-        #     '//*[@id="mG61Hd"]/div[2]/div/div[2]/div[1]/div/div/div[2]/div/div[1]/div/div[1]/input'
-        # )
-        # for box in textbox:
-        #     box.send_keys(student_id)
-
-        # # Kind of attendance
-        # attendance = driver.find_element_by_xpath(
-        #     "/html/body/div/div[3]/form/div[2]/div/div[2]/div[2]/div/div/div[2]/div/div/span/div/div[3]/label/div/div[1]/div/div[3]/div"
-        # )
-        # attendance.click()
-
-        # # Duration of attendance
-        # duration = driver.find_element_by_xpath(
-        #     "/html/body/div/div[3]/form/div[2]/div/div[2]/div[4]/div/div/div[2]/div[1]/div/span/div/div[2]/label/div/div[1]/div/div[3]/div"
-        # )
-        # duration.click()
-
-        # # click on submit button
-        # submit = driver.find_element_by_xpath(
-        #     "/html/body/div/div[3]/form/div[2]/div/div[3]/div[1]/div[1]/div/span/span"
-        # )
-        # submit.click()
-
-        # close the window
-        logging.info("Successfully submitted form\n")
-        driver.close()
-        driver.quit()
-
-    for id in ids:
-        fill_form(id, reference_name)
+        with spans.span("submit", student_id):
+            elements["submit"].click()
+
+        # Only count the ID as done once the form accepted it. An inline validation error leaves
+        # the page as is, and raising here keeps the ID pending for the next run.
+        with spans.span("confirm", student_id):
+            waiter.submitted()
+
+    waits = ", ".join(f"{record.name}={record.seconds:.2f}s" for record in waiter.records)
+    logging.info(f"Waited {waiter.total():.2f}s for {student_id}: {waits}")
+    # The driver goes back to the pool instead of being closed.
+
+
+def submit_direct(ids, journal):
+    """Submit forms over HTTP without a browser.
+
+    Returns the IDs left for the browser path, i.e. all IDs from the first one the form rejected.
+    """
+    with DirectSubmitter(FORM_URL, answers=DIRECT_ANSWERS) as submitter:
+        for idx, id in enumerate(ids):
+            try:
+                submitter.submit(id)
+            except FormLayoutChanged as e:
+                logging.warning(f"Direct submission failed, falling back to the browser: {e}")
+                return ids[idx:]
+            journal.record(FORM_URL, id, ok=True)
+    return []
+
+
+def journaled(submit, journal, url):
+    """Wrap `submit(driver, id)` to record its outcome for `url` in `journal`."""
+    def wrapper(driver, id):
+        start = time.perf_counter()
+        try:
+            submit(driver, id)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            journal.record(url, id, ok=False, error=error, duration=time.perf_counter() - start)
+            raise
+        journal.record(url, id, ok=True, duration=time.perf_counter() - start)
+    return wrapper
+
+
+def run_jobs(jobs_fp, journal):
+    """Run every job in `jobs_fp` concurrently, rate limited per form host."""
+    with open(jobs_fp) as f:
+        jobs = json.load(f)
+    references = {job["url"]: job.get("reference_name", reference_name) for job in jobs}
+    for job in jobs:
+        job["ids"] = journal.pending(job["url"], job["ids"])
+
+    with DriverPool(size=POOL_SIZE, spans=TIMINGS) as pool:
+        def submit(url, id):
+            with pool.driver() as driver:
+                journaled(partial(fill_form, reference_name=references[url], url=url), journal, url)(driver, id)
+
+        runner = AsyncBatchRunner(
+            submit,
+            rate=RATE_LIMIT,
+            max_concurrency=POOL_SIZE,
+            attempt_timeout=WAIT_TIMEOUT * 6,
+            transient=TRANSIENT_ERRORS + (WebDriverException,),
+        )
+        results = runner.run([(job["url"], job["ids"]) for job in jobs], timeout=JOBS_TIMEOUT)
+
+    failed = [result for result in results if not result.ok]
+    logging.info(f"{len(results) - len(failed)}/{len(results)} job submissions succeeded.")
+    if failed:
+        raise Exception("\n".join(f"{result.url} {result.item}: {result.error}" for result in failed))
+
+
+def report_timings():
+    """Print where the run spent its time and export the spans to TIMINGS_FILE."""
+    if not TIMINGS.spans:
+        return
+    # Printed like the rest of the run output, logging is not configured by default.
+    print(f"Time per phase:\n{TIMINGS.summary()}")
+    if TIMINGS_FILE:
+        TIMINGS.export(TIMINGS_FILE)
+
+
+def main():
+    with SubmissionJournal(JOURNAL_FILE, batch=dt.now().strftime(JOURNAL_BATCH)) as journal:
+        submit_all(journal)
+
+
+def submit_all(journal):
+    if JOBS_FILE:
+        run_jobs(JOBS_FILE, journal)
+        print(f"Successfully Filled Google Forms.\n{today_}")
+        return
+
+    remaining = journal.pending(FORM_URL, ids)
+    if len(remaining) < len(ids):
+        logging.info(f"Skipping {len(ids) - len(remaining)} IDs already submitted in batch {journal.batch}.")
+    if remaining and SUBMIT_MODE == "direct":
+        remaining = submit_direct(remaining, journal)
+
+    if remaining:
+        # Chrome is launched POOL_SIZE times per run instead of once per ID.
+        submit = journaled(partial(fill_form, reference_name=reference_name), journal, FORM_URL)
+        scheduler = FormScheduler(submit, max_workers=POOL_SIZE, spans=TIMINGS)
+        results = scheduler.run(remaining)
+        summary = FormScheduler.summarize(results)
+        logging.info(summary)
+        if not all(result.ok for result in results):
+            raise Exception(summary)
 
     msg_out = f"Successfully Filled Google Form.\n{today_}"
     print(msg_out)
     # gen_util.send_sms(env.SMS["SENDER"], env.SMS["PASSWORD"], persons, msg=msg_out)
 
 
+def run_daemon():
+    """Keep Python, the display and POOL_SIZE browsers warm and run jobs until SIGTERM."""
+    with DriverPool(size=POOL_SIZE, spans=TIMINGS) as pool, SubmissionJournal(JOURNAL_FILE) as journal:
+        def run_job(job):
+            # The daemon outlives batches, so the batch is that of the job.
+            journal.batch = dt.now().strftime(JOURNAL_BATCH)
+            pending = journal.pending(job.url, job.ids)
+            if len(pending) < len(job.ids):
+                n_skipped = len(job.ids) - len(pending)
+                logging.info(f"Skipping {n_skipped} IDs already submitted in batch {journal.batch}.")
+            fill = partial(fill_form, reference_name=job.reference_name or reference_name, url=job.url)
+            scheduler = FormScheduler(journaled(fill, journal, job.url), max_workers=POOL_SIZE)
+            results = scheduler.run(pending, pool=pool)
+            logging.info(FormScheduler.summarize(results))
+            # Export per job so the spans of a long-lived daemon don't pile up.
+            report_timings()
+            TIMINGS.clear()
+            return results
+
+        daemon = FormDaemon(run_job, queue_dir=DAEMON_DIR, socket_path=DAEMON_SOCKET)
+        signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+        daemon.serve_forever()
+
+
 if __name__ == "__main__":
     try:
-        main()
+        if "--daemon" in sys.argv[1:]:
+            run_daemon()
+        else:
+            main()
     except Exception as e:
         msg_out = f"Error occured autofilling Google Form. Check with Minh for details.\n{today_}"
         print(msg_out)
         print(e)
         # gen_util.send_sms(env.SMS["SENDER"], env.SMS["PASSWORD"], persons, msg=msg_out)
         # logging.error(f"Error: {e}")
+    finally:
+        report_timings()
+        ARTIFACTS.close()
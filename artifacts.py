@@ -0,0 +1,195 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import gzip
+import logging
+import os
+import queue
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+KINDS = ('screenshot', 'html')
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass
+class Artifact:
+    """One capture waiting to be written."""
+    item: str
+    reason: str
+    kind: str
+    data: bytes
+    taken_at: datetime
+
+
+class ArtifactWriter:
+    """Capture screenshots and page HTML from the browser thread, write them on a background one.
+
+    The browser thread only pays for grabbing the bytes from the driver. Compressing and
+    writing happen on the writer thread, behind a bounded queue. When the writer falls behind,
+    a capture waits at most `block_timeout` seconds for room and is dropped after that, so disk
+    I/O never holds up a submission for longer.
+
+    What gets captured is decided per submission: on failure, after submit, and/or every
+    `every_n`-th submission.
+
+    Example use:
+
+    with ArtifactWriter('artifacts', on_failure=True, every_n=10) as artifacts:
+        fill_form(driver, id)
+        artifacts.submitted(driver, id)
+    print(artifacts.stats)
+    """
+    def __init__(
+            self,
+            out_dir: str,
+            on_failure: bool = True,
+            after_submit: bool = False,
+            every_n: int = 0,
+            kinds: Sequence[str] = KINDS,
+            max_queue: int = 64,
+            block_timeout: float = 0,
+            compresslevel: int = 6,
+            logger: Optional[logging.Logger] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        out_dir : str
+            Artifacts are written to `<out_dir>/<YYYY-MM-DD>/`.
+        on_failure : bool, optional, default True
+            Capture when a submission raises.
+        after_submit : bool, optional, default False
+            Capture after every submission.
+        every_n : int, optional, default 0
+            Capture after every n-th submission. 0 disables sampling.
+        kinds : Sequence[str], optional, default KINDS
+            What to capture. Possible values: ['screenshot', 'html'].
+        max_queue : int, optional, default 64
+            Captures held in memory waiting for the writer.
+        block_timeout : float, optional, default 0
+            Seconds a capture waits for room in a full queue before it is dropped.
+        compresslevel : int, optional, default 6
+            gzip level of the HTML. Screenshots are PNGs, already compressed, and kept as is.
+        """
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            raise ValueError(f'Unknown artifact kinds {sorted(unknown)}, expected some of {KINDS}.')
+        self.out_dir = out_dir
+        self.on_failure = on_failure
+        self.after_submit = after_submit
+        self.every_n = every_n
+        self.kinds = tuple(kinds)
+        self.block_timeout = block_timeout
+        self.compresslevel = compresslevel
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = {'captured': 0, 'written': 0, 'dropped': 0, 'errors': 0, 'bytes': 0}
+        self._n_submitted = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='artifact-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'ArtifactWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def failed(self, driver: webdriver.Chrome, item: str) -> None:
+        """Call when the submission of `item` failed."""
+        if self.on_failure:
+            self.capture(driver, item, 'failure')
+
+    def submitted(self, driver: webdriver.Chrome, item: str) -> None:
+        """Call after `item` was submitted."""
+        with self._lock:
+            self._n_submitted += 1
+            sampled = self.every_n > 0 and self._n_submitted % self.every_n == 0
+        if self.after_submit:
+            self.capture(driver, item, 'submit')
+        elif sampled:
+            self.capture(driver, item, 'sample')
+
+    def capture(self, driver: webdriver.Chrome, item: str, reason: str) -> None:
+        """Grab the configured kinds from `driver` now and queue them for writing.
+
+        Never raises, a driver too broken to capture from is logged and skipped.
+        """
+        taken_at = datetime.now()
+        for kind in self.kinds:
+            try:
+                if kind == 'screenshot':
+                    data = driver.get_screenshot_as_png()
+                else:
+                    data = driver.page_source.encode()
+            except (WebDriverException, OSError) as e:
+                self.logger.warning(f'Could not capture {kind} of {item}: {e}')
+                self._count('errors')
+                continue
+            self._count('captured')
+            self._put(Artifact(str(item), reason, kind, data, taken_at))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.logger.info(f'Artifacts: {self.stats}')
+
+    def _put(self, artifact: Artifact) -> None:
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(artifact, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(artifact)
+        except queue.Full:
+            self._count('dropped')
+            self.logger.warning(f'Artifact queue full, dropped {artifact.kind} of {artifact.item}.')
+
+    def _run(self) -> None:
+        while True:
+            artifact = self._queue.get()
+            if artifact is None:
+                return
+            try:
+                n_bytes = self._write(artifact)
+            except OSError as e:
+                self._count('errors')
+                self.logger.error(f'Failed to write {artifact.kind} of {artifact.item}: {e}')
+            else:
+                self._count('written')
+                self._count('bytes', n_bytes)
+
+    def _write(self, artifact: Artifact) -> int:
+        dir = os.path.join(self.out_dir, f'{artifact.taken_at:%Y-%m-%d}')
+        os.makedirs(dir, exist_ok=True)
+        item = re.sub(r'[^\w.-]', '_', artifact.item)
+        name = f'{artifact.taken_at:%H%M%S_%f}_{item}_{artifact.reason}'
+        if artifact.kind == 'screenshot':
+            fp, data = os.path.join(dir, f'{name}.png'), artifact.data
+        else:
+            fp = os.path.join(dir, f'{name}.html.gz')
+            data = gzip.compress(artifact.data, compresslevel=self.compresslevel, mtime=0)
+
+        # Readers, e.g. an upload step, never see a half written file.
+        tmp_fp = f'{fp}.tmp'
+        with open(tmp_fp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_fp, fp)
+        return len(data)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
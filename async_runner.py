@@ -0,0 +1,228 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+from urllib.parse import urlparse
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+# Errors worth retrying: dropped connections, timeouts and the like.
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError)
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass
+class TaskResult:
+    """Outcome of one submission task."""
+    url: str
+    item: str
+    ok: bool
+    attempts: int
+    duration: float
+    error: Optional[str] = None
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` acquisitions per second with bursts of up to `capacity`."""
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncBatchRunner:
+    """Run form submissions for many forms concurrently under a per-host rate limit.
+
+    Each (url, item) pair is one task. Tasks wait for a concurrency slot, then on the token
+    bucket of their destination host, run `submit` in a worker thread (or await it directly if it is a coroutine function),
+    and are retried with jittered exponential backoff when they fail with a transient error.
+
+    A thread can't be stopped, so an attempt running in one is never abandoned: when it overruns
+    `attempt_timeout` or the batch deadline, it is waited for and its outcome counts. An item is
+    therefore never submitted by two attempts at once, and no thread outlives `run`.
+
+    Example use:
+
+    runner = AsyncBatchRunner(submit, rate=2, max_concurrency=8)
+    results = runner.run([(FORM_URL, ids), (OTHER_FORM_URL, other_ids)], timeout=600)
+    """
+    def __init__(
+            self,
+            submit: Callable[[str, str], None],
+            rate: float = 1,
+            burst: Optional[float] = None,
+            max_concurrency: int = 4,
+            retries: int = 3,
+            backoff: float = 0.5,
+            max_backoff: float = 30,
+            attempt_timeout: Optional[float] = None,
+            transient: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+            logger: Optional[logging.Logger] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        submit : Callable[[str, str], None]
+            Called with (url, item) to submit one form. Raising marks the attempt as failed.
+        rate : float, optional, default 1
+            Submissions per second allowed for each destination host.
+        burst : Optional[float], optional, default None
+            Bucket capacity. Defaults to max(1, rate).
+        max_concurrency : int, optional, default 4
+            Most submissions in flight at once across all hosts.
+        retries : int, optional, default 3
+            Extra attempts after a transient failure.
+        backoff : float, optional, default 0.5
+            Base delay in seconds, doubled on every retry before jitter is applied.
+        max_backoff : float, optional, default 30
+            Upper bound of the delay between two attempts.
+        attempt_timeout : Optional[float], optional, default None
+            Seconds after which a coroutine attempt is cancelled and counted as a transient
+            failure. Attempts running in a thread are only logged as slow and waited for.
+        transient : Tuple[Type[BaseException], ...], optional, default TRANSIENT_ERRORS
+            Exception types that are retried. Anything else fails the task at once.
+        """
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1.')
+        self.submit = submit
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.attempt_timeout = attempt_timeout
+        self.transient = transient
+        self.logger = logger or logging.getLogger(__name__)
+
+    def run(self, jobs: Iterable[Tuple[str, Sequence[str]]], timeout: Optional[float] = None) -> List[TaskResult]:
+        """Blocking wrapper around `run_async`."""
+        return asyncio.run(self.run_async(jobs, timeout=timeout))
+
+    async def run_async(
+            self,
+            jobs: Iterable[Tuple[str, Sequence[str]]],
+            timeout: Optional[float] = None
+        ) -> List[TaskResult]:
+        """Submit every item of every job and return the results in input order.
+
+        Parameters
+        ----------
+        jobs : Iterable[Tuple[str, Sequence[str]]]
+            Pairs of form URL and the items to submit to it.
+        timeout : Optional[float], optional, default None
+            Deadline for the whole batch. Tasks still waiting are cancelled and reported as
+            failed, tasks in the middle of a thread attempt finish that attempt first.
+        """
+        pairs = [(url, item) for url, items in jobs for item in items]
+        buckets: Dict[str, TokenBucket] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            tasks = []
+            for url, item in pairs:
+                host = urlparse(url).netloc
+                if host not in buckets:
+                    buckets[host] = TokenBucket(self.rate, self.burst)
+                task = self._task(url, item, buckets[host], semaphore, executor)
+                tasks.append(asyncio.ensure_future(task))
+
+            _, pending = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+            for task in pending:
+                task.cancel()
+            # Returns once the attempts still running in a thread are done, see `_call`.
+            await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            # Nothing should be left running by now. Waiting anyway guarantees no thread still
+            # holds, e.g., a pooled driver after `run` returned and the caller closed the pool.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        results = []
+        for (url, item), task in zip(pairs, tasks):
+            if not task.cancelled():
+                results.append(task.result())
+            else:
+                results.append(TaskResult(url, item, False, 0, 0.0, f'Cancelled after {timeout} seconds.'))
+        return results
+
+    async def _task(
+            self,
+            url: str,
+            item: str,
+            bucket: TokenBucket,
+            semaphore: asyncio.Semaphore,
+            executor: ThreadPoolExecutor
+        ) -> TaskResult:
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with semaphore:
+                    # Only take a token once a slot is free, tokens taken while waiting for one
+                    # would be spent all at once when slots free up together.
+                    await bucket.acquire()
+                    await self._call(url, item, executor)
+                return TaskResult(url, item, True, attempt, time.perf_counter() - start)
+            except self.transient as e:
+                if attempt > self.retries:
+                    return self._failed(url, item, attempt, start, e)
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+                self.logger.warning(f'Attempt {attempt} for {item} failed ({e!r}), retrying in {delay:.2f}s.')
+                await asyncio.sleep(delay)
+            except Exception as e:
+                return self._failed(url, item, attempt, start, e)
+
+    async def _call(self, url: str, item: str, executor: ThreadPoolExecutor) -> None:
+        if asyncio.iscoroutinefunction(self.submit):
+            await asyncio.wait_for(self.submit(url, item), self.attempt_timeout)
+            return
+
+        # Cancelling the wait would leave the thread submitting in the background while the
+        # item is retried, so the wait outlives both the attempt timeout and cancellation.
+        future = asyncio.wrap_future(executor.submit(self.submit, url, item))
+        timeout = self.attempt_timeout
+        cancelled = False
+        while not future.done():
+            try:
+                await asyncio.wait({future}, timeout=timeout)
+            except asyncio.CancelledError:
+                cancelled = True
+                continue
+            if not future.done():
+                self.logger.warning(f'Attempt for {item} still running after {timeout}s, waiting for it.')
+                timeout = None
+        # A cancelled task still reports a submission that went through, but does not retry.
+        if cancelled and (future.cancelled() or future.exception() is not None):
+            raise asyncio.CancelledError()
+        future.result()
+
+    def _failed(self, url: str, item: str, attempt: int, start: float, e: Exception) -> TaskResult:
+        error = f'{type(e).__name__}: {e}'
+        self.logger.error(f'Giving up on {item} for {url} after {attempt} attempts: {error}')
+        return TaskResult(url, item, False, attempt, time.perf_counter() - start, error)
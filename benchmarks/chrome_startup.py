@@ -0,0 +1,96 @@
+"""Time Chrome start-up for every launch profile in browser.PROFILES.
+
+cold  : launch a new browser and load the page, what each ID used to cost.
+warm  : reset a running pooled browser and load the page, what each ID costs with DriverPool.
+lookup: resolve chromedriver from the on-disk cache, what each run pays before the first launch.
+
+Usage:
+
+python benchmarks/chrome_startup.py --repeat 5 --url file:///tmp/form.html
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import browser  # noqa: E402
+from browser import PROFILES, DriverPool, chromedriver_path, launch_chrome  # noqa: E402
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_profile(profile, url: str, repeat: int) -> dict:
+    """Return the cold, warm and lookup timings of `profile` in seconds."""
+    display = None
+    if not profile.headless:
+        from pyvirtualdisplay import Display
+        display = Display(visible=0, size=(800, 800))
+        display.start()
+
+    try:
+        lookup = []
+        for _ in range(repeat):
+            browser._chromedriver_paths.clear()
+            lookup.append(_timed(chromedriver_path))
+
+        cold = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            driver = launch_chrome(profile)
+            driver.get(url)
+            cold.append(time.perf_counter() - start)
+            driver.quit()
+
+        warm = []
+        driver = launch_chrome(profile)
+        try:
+            driver.get(url)
+            for _ in range(repeat):
+                start = time.perf_counter()
+                DriverPool.reset(driver)
+                driver.get(url)
+                warm.append(time.perf_counter() - start)
+        finally:
+            driver.quit()
+    finally:
+        if display is not None:
+            display.stop()
+
+    return {
+        'profile': profile.name,
+        'lookup': statistics.median(lookup),
+        'cold': statistics.median(cold),
+        'warm': statistics.median(warm),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark Chrome start-up per launch profile.')
+    parser.add_argument('--url', default='about:blank', help='Page loaded after every start.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--json', action='store_true', help='Print results as JSON lines.')
+    args = parser.parse_args()
+
+    print(f'Median of {args.repeat} runs, in seconds.', file=sys.stderr)
+    if not args.json:
+        print(f'{"profile":<10}{"lookup":>10}{"cold":>10}{"warm":>10}')
+    for name in args.profiles:
+        result = bench_profile(PROFILES[name], args.url, args.repeat)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f'{result["profile"]:<10}{result["lookup"]:>10.3f}{result["cold"]:>10.3f}{result["warm"]:>10.3f}')
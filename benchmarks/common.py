@@ -0,0 +1,87 @@
+"""Synthetic data and measurement helpers shared by the benchmarks.
+
+Every generator takes a seed or a numpy Generator, so runs on different commits read the same data.
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import os
+import resource
+import sys
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+def make_frame(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Return `n_rows` of a typical attendance export."""
+    return pd.DataFrame({
+        'student_id': rng.integers(200_000, 220_000, n_rows),
+        'attendance': rng.choice(['In person', 'Online', 'Absent'], n_rows),
+        'duration': rng.choice(['1 hour', '2 hours'], n_rows),
+        'score': rng.random(n_rows).round(4) * 100,
+        'reference': rng.choice(['Makai', 'Rumi', 'Chris', 'Minh'], n_rows),
+    })
+
+
+def make_numeric_frame(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Return `n_rows` of numeric columns only, which arrow can memory-map without copying."""
+    return pd.DataFrame({
+        'student_id': rng.integers(200_000, 220_000, n_rows),
+        'score': rng.random(n_rows) * 100,
+        'minutes': rng.integers(0, 120, n_rows),
+        'weight': rng.random(n_rows),
+    })
+
+
+def make_sample_dir(
+        dir: str,
+        file_type: str,
+        n_files: int,
+        n_rows: int,
+        frame: Callable[[int, np.random.Generator], pd.DataFrame] = make_frame,
+        seed: int = 0,
+        **kwargs
+    ) -> int:
+    """Write `n_files` dated dumps of `n_rows` each to `dir` and return their size in bytes.
+
+    Parameters
+    ----------
+    file_type : str
+        Possible values: ['csv', 'ftr'].
+    frame : Callable[[int, np.random.Generator], pd.DataFrame], optional, default make_frame
+        Generates the rows of one file.
+    **kwargs
+        Passed on to `to_csv` or `to_feather`, e.g. compression='uncompressed'.
+    """
+    os.makedirs(dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_bytes = 0
+    for day in pd.date_range('2024-01-01', periods=n_files):
+        fp = os.path.join(dir, f'export_{day:%Y%m%d}.{file_type}')
+        df = frame(n_rows, rng)
+        if file_type == 'csv':
+            df.to_csv(fp, index=False, **kwargs)
+        else:
+            df.to_feather(fp, **kwargs)
+        n_bytes += os.path.getsize(fp)
+    return n_bytes
+
+
+def sheet_values(n_rows: int, seed: int = 0) -> List[List]:
+    """Return `n_rows` of `make_frame` as a worksheet value array, header row first.
+
+    Values are strings, like the Sheets API returns them with the default value render option.
+    """
+    df = make_frame(n_rows, np.random.default_rng(seed))
+    return [list(df.columns)] + df.astype(str).values.tolist()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB."""
+    # ru_maxrss is in KB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
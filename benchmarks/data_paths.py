@@ -0,0 +1,239 @@
+"""Time and memory benchmarks of the GeneralUtil data paths at several dataset scales.
+
+Generates directories of dated csv and feather dumps with a fixed seed, then measures
+`read_files`, `to_csv`, `gsheet_to_file` and `gsheets_to_files` (the last two against
+`FakeGsheetClient`). Every measurement runs in its own subprocess so peak resident memory is
+not shared between cases. Results are JSON lines tagged with the git commit, and --compare
+flags cases that got slower or hungrier than a previous results file.
+
+scale   files   rows/file   size on disk (csv)   gsheet rows
+xs         10         100   ~40 KB                     1_000
+s         100       1_000   ~4 MB                     10_000
+m       1_000      10_000   ~400 MB                  100_000
+l      10_000      10_000   ~4 GB                  1_000_000
+
+Spreadsheets are held in memory as Python lists and a real one stops at 10M cells, so the gsheet
+cases are capped separately instead of growing with files x rows.
+
+Usage:
+
+python benchmarks/data_paths.py --scales xs s --out results/HEAD.jsonl
+python benchmarks/data_paths.py --scales xs s --compare results/main.jsonl --threshold 1.2
+python benchmarks/data_paths.py --scales l --data-dir /mnt/bench --cases read_files:ftr  # Reuses data.
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from common import make_frame, make_sample_dir, peak_rss_mb, sheet_values
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_gsheets import FakeGsheetClient  # noqa: E402
+from general import GeneralUtil as gen_util  # noqa: E402
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCALES = {
+    'xs': {'n_files': 10, 'n_rows': 100, 'gsheet_rows': 1_000},
+    's': {'n_files': 100, 'n_rows': 1_000, 'gsheet_rows': 10_000},
+    'm': {'n_files': 1_000, 'n_rows': 10_000, 'gsheet_rows': 100_000},
+    'l': {'n_files': 10_000, 'n_rows': 10_000, 'gsheet_rows': 1_000_000},
+}
+
+CASES = [
+    'read_files:csv',
+    'read_files:ftr',
+    'to_csv:zip',
+    'to_csv:gzip',
+    'gsheet_to_file:csv',
+    'gsheets_to_files:csv',
+]
+
+# Worksheets per spreadsheet exported by the gsheets_to_files case, `gsheet_rows` in total.
+N_WORKSHEETS = 10
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+def make_dataset(dir: str, file_type: str, n_files: int, n_rows: int, seed: int = 0) -> int:
+    """Write `n_files` dated dumps of `n_rows` each to `dir` and return their size in bytes.
+
+    A marker file records the parameters, so an existing dataset with the same ones is reused.
+    """
+    marker_fp = os.path.join(dir, '.dataset.json')
+    params = {'file_type': file_type, 'n_files': n_files, 'n_rows': n_rows, 'seed': seed}
+    if os.path.exists(marker_fp):
+        with open(marker_fp) as f:
+            marker = json.load(f)
+        if marker['params'] == params:
+            return marker['bytes']
+
+    n_bytes = make_sample_dir(dir, file_type, n_files, n_rows, seed=seed)
+    with open(marker_fp, 'w') as f:
+        json.dump({'params': params, 'bytes': n_bytes}, f)
+    return n_bytes
+
+
+def run_case(case: str, scale: str, data_dir: str, out_dir: str, latency: float) -> Dict:
+    """Run one case in this process and return its rows, seconds and memory."""
+    n_files, n_rows = SCALES[scale]['n_files'], SCALES[scale]['n_rows']
+    gsheet_rows = SCALES[scale]['gsheet_rows']
+    method, arg = case.split(':')
+    rows = n_files * n_rows
+
+    # Everything the case needs but should not be timed happens before `baseline`.
+    if method == 'to_csv':
+        frame = make_frame(n_rows, np.random.default_rng(0))
+        # Same frame once per file, streamed, so the input costs no memory of its own.
+        func = lambda: gen_util.to_csv(itertools.repeat(frame, n_files), 'bench', out_dir, method=arg)
+    elif method == 'gsheet_to_file':
+        client = FakeGsheetClient({'bench': {'Sheet1': sheet_values(gsheet_rows)}}, latency)
+        rows = gsheet_rows
+        func = lambda: gen_util.gsheet_to_file(client, f'{out_dir}/sheet.{arg}', 'bench', 'Sheet1', format=arg)
+    elif method == 'gsheets_to_files':
+        values = sheet_values(gsheet_rows // N_WORKSHEETS)
+        client = FakeGsheetClient({'bench': {f'Sheet{i}': values for i in range(N_WORKSHEETS)}}, latency)
+        rows = gsheet_rows // N_WORKSHEETS * N_WORKSHEETS
+        exports = [('bench', f'Sheet{i}', f'{out_dir}/sheet{i}.{arg}') for i in range(N_WORKSHEETS)]
+        func = lambda: gen_util.gsheets_to_files(client, exports, format=arg)
+    else:
+        func = lambda: gen_util.read_files(os.path.join(data_dir, f'{scale}_{arg}'), arg)
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    output = func()
+    seconds = time.perf_counter() - start
+    if isinstance(output, pd.DataFrame):
+        rows = len(output)
+    return {'rows': rows, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb(), 'baseline_rss_mb': baseline}
+
+
+def bench(case: str, scale: str, data_dir: str, repeat: int, latency: float) -> Dict:
+    """Run `case` `repeat` times, each in a fresh interpreter, and aggregate the runs."""
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as out_dir:
+            cmd = [
+                sys.executable, __file__, '--case', case, '--scales', scale, '--data-dir', data_dir,
+                '--out-dir', out_dir, '--latency', str(latency),
+            ]
+            runs.append(json.loads(subprocess.run(cmd, capture_output=True, check=True, text=True).stdout))
+    seconds = statistics.median(run['seconds'] for run in runs)
+    return {
+        'case': case,
+        'scale': scale,
+        **SCALES[scale],
+        'rows': runs[0]['rows'],
+        'seconds': seconds,
+        'rows_per_s': runs[0]['rows'] / seconds if seconds else None,
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'delta_rss_mb': max(run['peak_rss_mb'] - run['baseline_rss_mb'] for run in runs),
+        'repeat': repeat,
+    }
+
+
+def environment() -> Dict:
+    """Return the commit and versions results are tagged with."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results: List[Dict], baseline_fp: str, threshold: float) -> Iterator[str]:
+    """Yield a line for every case that is `threshold` times slower or bigger than in `baseline_fp`."""
+    with open(baseline_fp) as f:
+        baseline = {(r['scale'], r['case']): r for r in map(json.loads, f) if 'case' in r}
+    for result in results:
+        old = baseline.get((result['scale'], result['case']))
+        if old is None:
+            continue
+        for metric in ('seconds', 'delta_rss_mb'):
+            # Ignore noise on tiny absolute values.
+            if old[metric] > 0.01 and result[metric] > old[metric] * threshold:
+                yield (
+                    f'{result["scale"]:<4}{result["case"]:<24}{metric:<14}'
+                    f'{old[metric]:>10.3f} -> {result[metric]:.3f} ({result[metric] / old[metric]:.2f}x)'
+                )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the GeneralUtil data paths.')
+    parser.add_argument('--scales', nargs='+', default=['xs', 's'], choices=list(SCALES))
+    parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', help='Where datasets are generated and reused. Default a temp dir.')
+    parser.add_argument('--latency', type=float, default=0, help='Seconds added to every fake Sheets call.')
+    parser.add_argument('--out', help='Append JSON lines here instead of printing them.')
+    parser.add_argument('--compare', help='Previous results file to check for regressions.')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Ratio counted as a regression.')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--out-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Child process: measure one case only.
+        print(json.dumps(run_case(args.case, args.scales[0], args.data_dir, args.out_dir, args.latency)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        env = environment()
+        results = []
+        for scale in args.scales:
+            for file_type in sorted({case.split(':')[1] for case in args.cases if case.startswith('read_files')}):
+                start = time.perf_counter()
+                n_bytes = make_dataset(
+                    os.path.join(data_dir, f'{scale}_{file_type}'), file_type,
+                    SCALES[scale]['n_files'], SCALES[scale]['n_rows']
+                )
+                print(
+                    f'{scale} {file_type}: {n_bytes / 1024 ** 2:.1f} MB ready in '
+                    f'{time.perf_counter() - start:.1f}s',
+                    file=sys.stderr
+                )
+            for case in args.cases:
+                result = {**env, **bench(case, scale, data_dir, args.repeat, args.latency)}
+                results.append(result)
+                print(
+                    f'{scale:<4}{case:<24}{result["seconds"]:>10.3f}s{result["delta_rss_mb"]:>10.1f} MB',
+                    file=sys.stderr
+                )
+
+    out = open(args.out, 'a') if args.out else sys.stdout
+    for result in results:
+        out.write(json.dumps(result) + '\n')
+    if args.out:
+        out.close()
+
+    if args.compare:
+        regressions = list(compare(results, args.compare, args.threshold))
+        for line in regressions:
+            print(f'Regression: {line}', file=sys.stderr)
+        sys.exit(1 if regressions else 0)
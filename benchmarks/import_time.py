@@ -0,0 +1,100 @@
+"""Measure how long `import general` takes and guard against heavy imports creeping back in.
+
+Runs `python -X importtime -c "import general"` in fresh interpreters and reports the median
+cumulative import time and the slowest modules. Exits with status 1 when the median exceeds
+--budget-ms or when any of the lazily imported packages is loaded eagerly, so it can run in CI.
+
+Usage:
+
+python benchmarks/import_time.py --repeat 5 --budget-ms 150
+python benchmarks/import_time.py --module browser --top 20
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages general.py only imports when a function needs them.
+LAZY_MODULES = ('pandas', 'pygsheets', 'IPython', 'google.oauth2', 'google.auth', 'smtplib')
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Import `module` in a fresh interpreter and return {name: (self_us, cumulative_us)}."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.strip() == 'site':
+            # Interpreter start-up, paid whatever is imported.
+            times.clear()
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def bench_import(module: str, repeat: int) -> Tuple[float, List[Dict[str, Tuple[int, int]]]]:
+    """Return the median cumulative import time of `module` in ms and the raw runs."""
+    runs = [import_times(module) for _ in range(repeat)]
+    median_ms = statistics.median(run[module][1] for run in runs) / 1000
+    return median_ms, runs
+
+
+def eager_imports(times: Dict[str, Tuple[int, int]], lazy_modules=LAZY_MODULES) -> List[str]:
+    """Return the entries of `lazy_modules` that were imported anyway."""
+    return [name for name in lazy_modules if name in times]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark and guard the import time of a module.')
+    parser.add_argument('--module', default='general')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list.')
+    parser.add_argument('--budget-ms', type=float, help='Fail when the median exceeds this.')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON.')
+    args = parser.parse_args()
+
+    median_ms, runs = bench_import(args.module, args.repeat)
+    last = runs[-1]
+    slowest = sorted(
+        [(name, us) for name, us in last.items() if name != args.module], key=lambda kv: kv[1][1], reverse=True
+    )[:args.top]
+    eager = eager_imports(last) if args.module == 'general' else []
+    over_budget = args.budget_ms is not None and median_ms > args.budget_ms
+
+    if args.json:
+        print(json.dumps({
+            'module': args.module,
+            'median_ms': median_ms,
+            'budget_ms': args.budget_ms,
+            'eager_imports': eager,
+            'slowest': [{'name': name, 'cumulative_ms': cum / 1000} for name, (_, cum) in slowest],
+        }))
+    else:
+        print(f'import {args.module}: median {median_ms:.1f} ms over {args.repeat} runs')
+        print(f'{"module":<50}{"self ms":>10}{"cum ms":>10}')
+        for name, (self_us, cumulative_us) in slowest:
+            print(f'{name:<50}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}')
+        if eager:
+            print(f'Imported eagerly: {", ".join(eager)}', file=sys.stderr)
+        if over_budget:
+            print(f'Over budget: {median_ms:.1f} ms > {args.budget_ms:.1f} ms', file=sys.stderr)
+
+    sys.exit(1 if eager or over_budget else 0)
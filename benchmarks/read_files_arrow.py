@@ -0,0 +1,67 @@
+"""Compare read_files on feather files with the pandas and the memory-mapped arrow engine.
+
+Each engine runs in its own subprocess so that peak resident memory is measured separately.
+
+Usage:
+
+python benchmarks/read_files_arrow.py --dir data/daily_ftr --columns student_id score
+python benchmarks/read_files_arrow.py --n-files 20 --n-rows 1000000  # Generates a sample directory.
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import make_numeric_frame, make_sample_dir, peak_rss_mb
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from general import GeneralUtil as gen_util  # noqa: E402
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+def run_engine(dir: str, engine: str, columns) -> dict:
+    """Read `dir` with `engine` and return load time and peak RSS of this process."""
+    start = time.perf_counter()
+    df = gen_util.read_files(dir, 'ftr', columns=columns, engine=engine)
+    seconds = time.perf_counter() - start
+    return {'engine': engine, 'rows': len(df), 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the read_files arrow engine.')
+    parser.add_argument('--dir', help='Directory of feather files. Default generates one.')
+    parser.add_argument('--n-files', type=int, default=10)
+    parser.add_argument('--n-rows', type=int, default=500_000)
+    parser.add_argument('--columns', nargs='+', help='Column subset to read.')
+    parser.add_argument('--engine', choices=['pandas', 'arrow'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        # Child process: measure one engine only.
+        print(json.dumps(run_engine(args.dir, args.engine, args.columns)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dir = args.dir
+        if dir is None:
+            dir = tmp_dir
+            # Uncompressed, so the arrow engine can memory-map the columns.
+            make_sample_dir(
+                dir, 'ftr', args.n_files, args.n_rows, frame=make_numeric_frame, compression='uncompressed'
+            )
+
+        print(f'{"engine":<8}{"rows":>12}{"seconds":>10}{"peak MB":>10}')
+        for engine in ('pandas', 'arrow'):
+            cmd = [sys.executable, __file__, '--dir', dir, '--engine', engine]
+            if args.columns:
+                cmd += ['--columns', *args.columns]
+            result = json.loads(subprocess.run(cmd, capture_output=True, check=True).stdout)
+            print(f'{engine:<8}{result["rows"]:>12}{result["seconds"]:>10.3f}{result["peak_rss_mb"]:>10.1f}')
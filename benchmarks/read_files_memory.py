@@ -0,0 +1,64 @@
+"""Compare the memory footprint of read_files with and without dtype control.
+
+Reads the same directory twice, once as is and once with downcasting and categoricals, and
+prints the deep memory usage of every column before and after.
+
+Usage:
+
+python benchmarks/read_files_memory.py --dir data/daily --file-type csv --categorize 0.5
+python benchmarks/read_files_memory.py  # Generates a sample directory.
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from common import make_sample_dir
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from general import GeneralUtil as gen_util  # noqa: E402
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> str:
+    """Format per-column memory usage of `before` and `after` in MB."""
+    mb = 1024 ** 2
+    usage_before = before.memory_usage(deep=True, index=False)
+    usage_after = after.memory_usage(deep=True, index=False)
+    lines = [f'{"column":<20}{"dtype":>12}{"before":>10}{"after":>10}']
+    for col in usage_before.index:
+        after_mb = usage_after.get(col, 0) / mb
+        dtype = str(after[col].dtype) if col in after else '-'
+        lines.append(f'{col:<20}{dtype:>12}{usage_before[col] / mb:>10.2f}{after_mb:>10.2f}')
+    total_before, total_after = usage_before.sum() / mb, usage_after.sum() / mb
+    lines.append(f'{"total":<20}{"":>12}{total_before:>10.2f}{total_after:>10.2f}')
+    lines.append(f'Reduction: {1 - total_after / total_before:.1%}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory report for read_files dtype control.')
+    parser.add_argument('--dir', help='Directory to read. Default generates a sample directory.')
+    parser.add_argument('--file-type', default='csv', choices=['csv', 'ftr'])
+    parser.add_argument('--columns', nargs='+', help='Column subset to read.')
+    parser.add_argument('--categorize', type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dir = args.dir
+        if dir is None:
+            dir = tmp_dir
+            make_sample_dir(dir, 'csv', n_files=10, n_rows=50_000)
+
+        before = gen_util.read_files(dir, args.file_type)
+        after = gen_util.read_files(
+            dir, args.file_type, columns=args.columns, downcast=True, categorize=args.categorize
+        )
+        print(memory_report(before, after))
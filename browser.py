@@ -0,0 +1,311 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import chromedriver_autoinstaller
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from timing import SpanRecorder
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+CHROMEDRIVER_DIR = os.environ.get('CHROMEDRIVER_DIR', os.path.expanduser('~/.cache/chromedriver'))
+
+_chromedriver_paths: Dict[str, str] = {}
+_chromedriver_lock = threading.Lock()
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass(frozen=True)
+class LaunchProfile:
+    """Everything that decides how Chrome is started.
+
+    Headless profiles need no X display, so the template only starts Xvfb for the others.
+    """
+    name: str
+    headless: bool = False
+    args: Tuple[str, ...] = ()
+    prefs: Dict = field(default_factory=dict)
+    page_load_strategy: str = 'normal'
+
+
+PROFILES = {
+    # What the template has always used: a visible browser inside the virtual display.
+    'default': LaunchProfile(
+        name='default',
+        args=(
+            '-incognito',
+            '--window-size=1200,1200',
+            '--ignore-certificate-errors',
+        ),
+    ),
+    # Trimmed down for start-up time: no display, images, extensions or background traffic.
+    'lean': LaunchProfile(
+        name='lean',
+        headless=True,
+        args=(
+            '--headless=new',
+            '-incognito',
+            '--window-size=1200,1200',
+            '--ignore-certificate-errors',
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--disable-default-apps',
+            '--disable-sync',
+            '--no-first-run',
+            '--blink-settings=imagesEnabled=false',
+        ),
+        prefs={'profile.managed_default_content_settings.images': 2},
+        page_load_strategy='eager',
+    ),
+}
+
+DEFAULT_PROFILE = PROFILES[os.environ.get('CHROME_PROFILE', 'lean')]
+
+
+def build_chrome_options(profile: LaunchProfile = DEFAULT_PROFILE) -> webdriver.ChromeOptions:
+    """Build the Chrome options for `profile`."""
+    chrome_options = webdriver.ChromeOptions()
+    for arg in profile.args:
+        chrome_options.add_argument(arg)
+    if profile.prefs:
+        chrome_options.add_experimental_option('prefs', profile.prefs)
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    chrome_options.page_load_strategy = profile.page_load_strategy
+    return chrome_options
+
+
+def chromedriver_path(cache_dir: str = CHROMEDRIVER_DIR) -> str:
+    """Path to a chromedriver matching the installed Chrome, downloading it at most once.
+
+    The lookup is cached in `cache_dir` by Chrome version, so later runs skip the version check
+    against the chromedriver download site. Keep `cache_dir` between CI runs to benefit there too.
+    """
+    with _chromedriver_lock:
+        if cache_dir not in _chromedriver_paths:
+            _chromedriver_paths[cache_dir] = _lookup_chromedriver(cache_dir)
+        return _chromedriver_paths[cache_dir]
+
+
+def _lookup_chromedriver(cache_dir: str) -> str:
+    version = chromedriver_autoinstaller.get_chrome_version()
+    cache_fp = os.path.join(cache_dir, 'lookup.json')
+    cache = {}
+    if os.path.exists(cache_fp):
+        with open(cache_fp) as f:
+            cache = json.load(f)
+    path = cache.get(version)
+    if path and os.access(path, os.X_OK):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = chromedriver_autoinstaller.install(path=cache_dir)
+    cache[version] = path
+    with open(cache_fp, 'w') as f:
+        json.dump(cache, f)
+    return path
+
+
+def launch_chrome(profile: LaunchProfile = DEFAULT_PROFILE) -> webdriver.Chrome:
+    """Start a new Chrome driver with `profile`."""
+    service = Service(executable_path=chromedriver_path())
+    return webdriver.Chrome(service=service, options=build_chrome_options(profile))
+
+
+class DriverPool:
+    """Pool of long-lived Chrome drivers reused across form submissions.
+
+    Drivers are launched once and handed out one submission at a time. Between uses the
+    browser state is wiped so every submission starts from a clean incognito session, and a
+    driver that crashed or stopped responding is quit and replaced by a fresh one.
+
+    Example use:
+
+    with DriverPool(size=2) as pool:
+        with pool.driver() as driver:
+            driver.get('file:///tmp/form.html')
+    """
+    def __init__(
+            self,
+            size: int = 1,
+            launcher: Callable[[], webdriver.Chrome] = launch_chrome,
+            logger: Optional[logging.Logger] = None,
+            spans: Optional[SpanRecorder] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        size : int, optional, default 1
+            Number of Chrome instances kept alive.
+        launcher : Callable[[], webdriver.Chrome], optional, default launch_chrome
+            Zero-argument callable returning a new driver.
+        logger : Optional[logging.Logger], optional, default None
+            Logger used for pool events. Defaults to the module logger.
+        spans : Optional[SpanRecorder], optional, default None
+            Records 'launch' and 'quit' spans of every driver when given.
+        """
+        if size < 1:
+            raise ValueError('size must be at least 1.')
+        self.size = size
+        self.launcher = launcher
+        self.logger = logger or logging.getLogger(__name__)
+        self.spans = spans
+        self._idle = queue.LifoQueue()
+        self._drivers: List[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> 'DriverPool':
+        try:
+            self.start()
+        except Exception:
+            self.close()  # Quit the drivers that did start.
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Launch every driver of the pool up front, in parallel."""
+        n_missing = self.size - len(self._drivers)
+        if n_missing < 1:
+            return
+        with ThreadPoolExecutor(max_workers=n_missing) as executor:
+            for driver in executor.map(lambda _: self._launch(), range(n_missing)):
+                self._idle.put(driver)
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        """Take an idle driver out of the pool, blocking until one is available.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional, default None
+            Seconds to wait for an idle driver. None waits forever.
+        """
+        if self._closed:
+            raise RuntimeError('DriverPool is closed.')
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f'No idle driver after {timeout} seconds.')
+        if not self._is_alive(driver):
+            driver = self._replace(driver)
+        return driver
+
+    def release(self, driver: webdriver.Chrome, broken: bool = False) -> None:
+        """Return `driver` to the pool after wiping its state.
+
+        Parameters
+        ----------
+        broken : bool, optional, default False
+            Whether the caller saw the driver fail. Broken drivers, and drivers that fail to
+            reset, are replaced instead of being reused.
+        """
+        if self._closed:
+            self._quit(driver)
+            return
+        if not broken:
+            try:
+                self.reset(driver)
+            except Exception as e:
+                self.logger.warning(f'Failed to reset driver, replacing it: {e}')
+                broken = True
+        if broken:
+            driver = self._replace(driver)
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None) -> Iterator[webdriver.Chrome]:
+        """Context manager around `acquire` and `release`."""
+        driver = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    @staticmethod
+    def reset(driver: webdriver.Chrome) -> None:
+        """Wipe cookies, storage, cache and extra windows so the next use starts clean."""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # Storage is per origin, so clear it while still on the page that wrote it.
+        try:
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+        except WebDriverException:
+            pass  # about:blank and file:// pages deny access to storage.
+        driver.delete_all_cookies()
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        driver.get('about:blank')
+
+    def close(self) -> None:
+        """Quit every driver owned by the pool."""
+        self._closed = True
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            self._quit(driver)
+
+    def _launch(self) -> webdriver.Chrome:
+        with self._span('launch'):
+            driver = self.launcher()
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _replace(self, driver: webdriver.Chrome) -> webdriver.Chrome:
+        self.logger.info('Replacing crashed driver.')
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        self._quit(driver)
+        try:
+            return self._launch()
+        except Exception:
+            # Keep the slot, the next acquire finds this driver dead and tries again.
+            self._idle.put(driver)
+            raise
+
+    @staticmethod
+    def _is_alive(driver: webdriver.Chrome) -> bool:
+        try:
+            driver.window_handles
+            return True
+        except Exception:  # A dead chromedriver surfaces as urllib3 connection errors.
+            return False
+
+    def _quit(self, driver: webdriver.Chrome) -> None:
+        try:
+            with self._span('quit'):
+                driver.quit()
+        except Exception as e:
+            self.logger.warning(f'Failed to quit driver: {e}')
+
+    def _span(self, name: str):
+        return self.spans.span(name) if self.spans is not None else nullcontext()
@@ -0,0 +1,258 @@
+"""Resident form filling daemon and its client.
+
+The daemon keeps the interpreter, display and Chrome pool warm and takes jobs from a file-drop
+queue directory and a Unix socket. Start it with `python Selenium-Template.py --daemon`, then:
+
+python daemon.py --socket /tmp/forms.sock --url https://docs.google.com/forms/... --ids 210072 210071
+python daemon.py --queue-dir /var/spool/forms --url https://docs.google.com/forms/... --ids 210072
+
+The socket waits for the job and prints its results. The queue returns at once, the results
+land in `<queue-dir>/done/<job id>.json`.
+"""
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass
+class Job:
+    """Form URL and the IDs to submit to it."""
+    url: str
+    ids: List[str]
+    reference_name: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Job':
+        return cls(
+            url=data['url'],
+            ids=[str(id) for id in data['ids']],
+            reference_name=data.get('reference_name'),
+            id=data.get('id') or uuid.uuid4().hex[:12],
+        )
+
+
+class FormDaemon:
+    """Run jobs one after the other on a warm pool of browsers.
+
+    Jobs come from `<queue_dir>/incoming/*.json` files, claimed by moving them to `processing/`
+    and answered in `done/`, and from newline delimited JSON on a Unix socket, answered on the
+    same connection. Jobs left in `processing/` by a crash are picked up again on start.
+
+    Example use:
+
+    with DriverPool(size=2) as pool:
+        run_job = lambda job: FormScheduler(partial(fill_form, url=job.url), max_workers=2).run(job.ids, pool=pool)
+        daemon = FormDaemon(run_job, queue_dir='/var/spool/forms', socket_path='/tmp/forms.sock')
+        daemon.serve_forever()
+    """
+    def __init__(
+            self,
+            run_job: Callable[[Job], List],
+            queue_dir: Optional[str] = None,
+            socket_path: Optional[str] = None,
+            poll_interval: float = 1,
+            logger: Optional[logging.Logger] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        run_job : Callable[[Job], List]
+            Submits every ID of a job and returns one dataclass result per ID.
+        queue_dir : Optional[str], optional, default None
+            File-drop queue directory. None disables the queue.
+        socket_path : Optional[str], optional, default None
+            Unix socket to listen on. None disables the socket.
+        poll_interval : float, optional, default 1
+            Seconds between two scans of the queue directory.
+        """
+        if queue_dir is None and socket_path is None:
+            raise ValueError('Give a queue_dir, a socket_path or both.')
+        self.run_job = run_job
+        self.queue_dir = queue_dir
+        self.socket_path = socket_path
+        self.poll_interval = poll_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = {'jobs': 0, 'items': 0, 'failed': 0, 'seconds': 0.0}
+        self._jobs = queue.Queue()
+        self._stop = threading.Event()
+        self._server = None
+
+    def submit(self, job: Job) -> Future:
+        """Queue `job` and return a future of its results."""
+        future = Future()
+        self._jobs.put((job, future))
+        return future
+
+    def serve_forever(self) -> None:
+        """Run jobs until `stop` is called, e.g. from a SIGTERM handler."""
+        threads = []
+        if self.queue_dir:
+            for sub_dir in ('incoming', 'processing', 'done'):
+                os.makedirs(os.path.join(self.queue_dir, sub_dir), exist_ok=True)
+            self._requeue_unfinished()
+            threads.append(threading.Thread(target=self._watch_queue_dir, name='queue-dir', daemon=True))
+        if self.socket_path:
+            self._server = self._make_server()
+            threads.append(threading.Thread(target=self._server.serve_forever, name='socket', daemon=True))
+        for thread in threads:
+            thread.start()
+        self.logger.info(f'Daemon ready, queue: {self.queue_dir}, socket: {self.socket_path}')
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    job, future = self._jobs.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if future.set_running_or_notify_cancel():
+                    self._run(job, future)
+        finally:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                os.unlink(self.socket_path)
+            self.logger.info(f'Daemon stopped: {self.stats}')
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, job: Job, future: Future) -> None:
+        start = time.perf_counter()
+        self.logger.info(f'Running job {job.id}: {len(job.ids)} IDs for {job.url}')
+        try:
+            results = self.run_job(job)
+        except Exception as e:
+            self.logger.error(f'Job {job.id} failed: {type(e).__name__}: {e}')
+            future.set_exception(e)
+            return
+        seconds = time.perf_counter() - start
+        self.stats['jobs'] += 1
+        self.stats['items'] += len(results)
+        self.stats['failed'] += sum(not result.ok for result in results)
+        self.stats['seconds'] += seconds
+        self.logger.info(f'Job {job.id} done in {seconds:.2f}s.')
+        future.set_result(results)
+
+    def _watch_queue_dir(self) -> None:
+        incoming = os.path.join(self.queue_dir, 'incoming')
+        while not self._stop.is_set():
+            for name in sorted(os.listdir(incoming)):
+                # Writers drop `*.json.tmp` and rename it, so half written files are never read.
+                if name.endswith('.json'):
+                    self._claim(name)
+            self._stop.wait(self.poll_interval)
+
+    def _claim(self, name: str) -> None:
+        processing_fp = os.path.join(self.queue_dir, 'processing', name)
+        try:
+            os.rename(os.path.join(self.queue_dir, 'incoming', name), processing_fp)
+        except FileNotFoundError:
+            return  # Claimed by another daemon.
+
+        try:
+            with open(processing_fp) as f:
+                job = Job.from_dict(json.load(f))
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.error(f'Dropping malformed job {name}: {e}')
+            self._finish(processing_fp, name, {'error': f'Malformed job: {e}'})
+            return
+
+        future = self.submit(job)
+        future.add_done_callback(lambda future: self._finish(processing_fp, name, _response(job, future)))
+
+    def _finish(self, processing_fp: str, name: str, response: Dict) -> None:
+        done_fp = os.path.join(self.queue_dir, 'done', name)
+        with open(f'{done_fp}.tmp', 'w') as f:
+            json.dump(response, f, indent=2)
+        os.replace(f'{done_fp}.tmp', done_fp)
+        os.remove(processing_fp)
+
+    def _requeue_unfinished(self) -> None:
+        processing = os.path.join(self.queue_dir, 'processing')
+        for name in os.listdir(processing):
+            self.logger.warning(f'Requeueing unfinished job {name}.')
+            os.rename(os.path.join(processing, name), os.path.join(self.queue_dir, 'incoming', name))
+
+    def _make_server(self) -> socketserver.ThreadingUnixStreamServer:
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        job = Job.from_dict(json.loads(line))
+                    except (ValueError, KeyError, TypeError) as e:
+                        response = {'error': f'Malformed job: {e}'}
+                    else:
+                        future = daemon.submit(job)
+                        future.exception()  # Wait for the job.
+                        response = _response(job, future)
+                    self.wfile.write((json.dumps(response) + '\n').encode())
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Left over from a daemon that was killed.
+        server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+        return server
+
+
+def _response(job: Job, future: Future) -> Dict:
+    if future.exception() is not None:
+        e = future.exception()
+        return {'job': job.id, 'error': f'{type(e).__name__}: {e}'}
+    return {'job': job.id, 'results': [asdict(result) for result in future.result()]}
+
+
+def send_job(socket_path: str, job: Dict, timeout: Optional[float] = None) -> Dict:
+    """Send `job` to the daemon listening on `socket_path` and wait for its results."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(job) + '\n').encode())
+        with sock.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+def drop_job(queue_dir: str, job: Dict) -> str:
+    """Drop `job` into the queue directory of a daemon and return the path of its results."""
+    job = {**job, 'id': job.get('id') or uuid.uuid4().hex[:12]}
+    incoming_fp = os.path.join(queue_dir, 'incoming', f'{job["id"]}.json')
+    with open(f'{incoming_fp}.tmp', 'w') as f:
+        json.dump(job, f)
+    os.replace(f'{incoming_fp}.tmp', incoming_fp)
+    return os.path.join(queue_dir, 'done', f'{job["id"]}.json')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Send a job to a running form daemon.')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--socket', help='Unix socket of the daemon, waits for the results.')
+    target.add_argument('--queue-dir', help='Queue directory of the daemon, returns at once.')
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--ids', nargs='+', required=True)
+    parser.add_argument('--reference-name')
+    parser.add_argument('--timeout', type=float)
+    args = parser.parse_args()
+
+    job = {'url': args.url, 'ids': args.ids, 'reference_name': args.reference_name}
+    if args.socket:
+        print(json.dumps(send_job(args.socket, job, timeout=args.timeout), indent=2))
+    else:
+        print(f'Results will be written to {drop_job(args.queue_dir, job)}')
@@ -0,0 +1,251 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import json
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Union
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+SCHEMA_CACHE_FP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.form_schema.json')
+
+# Values are either text, formatted with the student ID, or the index of the option to pick.
+Answer = Union[str, int]
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+class FormLayoutChanged(Exception):
+    """The cached form schema no longer matches the live form."""
+
+
+@dataclass
+class FormField:
+    """One question of the form."""
+    name: str
+    title: str = ''
+    options: List[str] = field(default_factory=list)
+
+
+@dataclass
+class FormSchema:
+    """Field names and option values needed to post a form without a browser."""
+    url: str
+    action: str
+    fields: List[FormField]
+    hidden: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_html(cls, html: str, url: str) -> 'FormSchema':
+        """Learn the schema from the form page HTML.
+
+        Google Forms embed their questions in `FB_PUBLIC_LOAD_DATA_`. Any other page is parsed
+        as a plain HTML form.
+        """
+        parser = _FormParser()
+        parser.feed(html)
+
+        match = re.search(r'FB_PUBLIC_LOAD_DATA_\s*=\s*(.*?);\s*</script>', html, re.S)
+        if match:
+            fields = _google_fields(json.loads(match.group(1)))
+            action = re.sub(r'/viewform.*$', '/formResponse', url)
+        else:
+            fields = [FormField(name, options=options) for name, options in parser.fields.items()]
+            action = urljoin(url, parser.action or url)
+        if not fields:
+            raise FormLayoutChanged(f'No form fields found at {url}.')
+        return cls(url, action, fields, parser.hidden)
+
+    @classmethod
+    def from_driver(cls, driver) -> 'FormSchema':
+        """Learn the schema from a page already loaded in a Selenium driver."""
+        return cls.from_html(driver.page_source, driver.current_url)
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'FormSchema':
+        return cls(d['url'], d['action'], [FormField(**f) for f in d['fields']], d.get('hidden', {}))
+
+    def payload(self, answers: Sequence[Answer], student_id: str) -> Dict[str, str]:
+        """Build the POST body for `student_id`.
+
+        Parameters
+        ----------
+        answers : Sequence[Answer]
+            One answer per field, in form order. Strings are formatted with `student_id`,
+            integers pick the option at that index.
+        """
+        if len(answers) != len(self.fields):
+            raise FormLayoutChanged(f'Expected {len(self.fields)} answers, got {len(answers)}.')
+
+        data = dict(self.hidden)
+        for form_field, answer in zip(self.fields, answers):
+            if isinstance(answer, int):
+                if answer >= len(form_field.options):
+                    raise FormLayoutChanged(f'`{form_field.name}` has no option {answer}.')
+                data[form_field.name] = form_field.options[answer]
+            else:
+                data[form_field.name] = answer.format(student_id=student_id)
+        return data
+
+
+class DirectSubmitter:
+    """Submit forms as plain HTTP POSTs over pooled keep-alive connections.
+
+    The schema is learned once per form and cached on disk, so each later submission is a
+    single request. A `FormLayoutChanged` error means the caller should fall back to the
+    browser path.
+
+    Example use:
+
+    with DirectSubmitter(FORM_URL, answers=['{student_id}', 0, 0]) as submitter:
+        for id in ids:
+            submitter.submit(id)
+    """
+    def __init__(
+            self,
+            url: str,
+            answers: Sequence[Answer],
+            cache_fp: Optional[str] = SCHEMA_CACHE_FP,
+            pool_size: int = 4,
+            timeout: float = 10,
+            logger: Optional[logging.Logger] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        url : str
+            Form page, e.g. the Google Form `viewform` link.
+        answers : Sequence[Answer]
+            See `FormSchema.payload`.
+        cache_fp : Optional[str], optional, default SCHEMA_CACHE_FP
+            JSON file where learned schemas are kept, keyed by form URL. None disables the cache.
+        pool_size : int, optional, default 4
+            Number of keep-alive connections kept per host.
+        timeout : float, optional, default 10
+            Seconds before a request gives up.
+        """
+        self.url = url
+        self.answers = answers
+        self.cache_fp = cache_fp
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._schema: Optional[FormSchema] = None
+        self._fresh = False
+
+    def __enter__(self) -> 'DirectSubmitter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def schema(self) -> FormSchema:
+        if self._schema is None:
+            self._schema = self._load_schema()
+        return self._schema
+
+    def learn(self, schema: Optional[FormSchema] = None) -> FormSchema:
+        """Refresh the schema from the live form, or store one recorded in a browser run."""
+        if schema is None:
+            response = self.session.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            schema = FormSchema.from_html(response.text, self.url)
+        self._schema = schema
+        self._fresh = True
+        self._save_schema(schema)
+        return schema
+
+    def submit(self, student_id: str) -> None:
+        """Post the form for `student_id`, relearning a stale cached schema once."""
+        try:
+            self._post(student_id)
+        except FormLayoutChanged:
+            if self._fresh:
+                raise
+            self.logger.warning('Cached form schema is stale, learning it again.')
+            self.learn()
+            self._post(student_id)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _post(self, student_id: str) -> None:
+        data = self.schema.payload(self.answers, student_id)
+        response = self.session.post(self.schema.action, data=data, timeout=self.timeout)
+        # Google answers 400 when a field or option no longer exists.
+        if response.status_code == 400:
+            raise FormLayoutChanged(f'Form rejected submission for {student_id}.')
+        response.raise_for_status()
+        self.logger.info(f'Submitted form for {student_id} directly.')
+
+    def _load_schema(self) -> FormSchema:
+        if self.cache_fp and os.path.exists(self.cache_fp):
+            with open(self.cache_fp) as f:
+                cached = json.load(f).get(self.url)
+            if cached:
+                return FormSchema.from_dict(cached)
+        return self.learn()
+
+    def _save_schema(self, schema: FormSchema) -> None:
+        if not self.cache_fp:
+            return
+        cache = {}
+        if os.path.exists(self.cache_fp):
+            with open(self.cache_fp) as f:
+                cache = json.load(f)
+        cache[schema.url] = asdict(schema)
+        with open(self.cache_fp, 'w') as f:
+            json.dump(cache, f, indent=2)
+
+
+def _google_fields(data: List) -> List[FormField]:
+    """Extract fields from a Google Form `FB_PUBLIC_LOAD_DATA_` array."""
+    fields = []
+    for item in data[1][1]:
+        # Section headers, images and text blocks have no entries.
+        if len(item) < 5 or not item[4]:
+            continue
+        for entry in item[4]:
+            options = [option[0] for option in (entry[1] or [])]
+            fields.append(FormField(f'entry.{entry[0]}', item[1] or '', options))
+    return fields
+
+
+class _FormParser(HTMLParser):
+    """Collect the action, hidden inputs and named fields of the first form on a page."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.action: Optional[str] = None
+        self.hidden: Dict[str, str] = {}
+        self.fields: Dict[str, List[str]] = {}
+        self._in_form = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form' and self.action is None:
+            self._in_form = True
+            self.action = attrs.get('action')
+        elif tag == 'input' and attrs.get('type') == 'hidden' and attrs.get('name'):
+            self.hidden[attrs['name']] = attrs.get('value') or ''
+        elif self._in_form and tag in ('input', 'textarea') and attrs.get('name'):
+            options = self.fields.setdefault(attrs['name'], [])
+            if attrs.get('type') in ('radio', 'checkbox'):
+                options.append(attrs.get('value') or '')
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._in_form = False
@@ -0,0 +1,154 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+FORM_HTML = """<!DOCTYPE html>
+<html>
+<body>
+<form action="/formResponse" method="POST">
+  <input type="hidden" name="fvv" value="1">
+  <label>Student ID <input type="text" name="entry.1001"></label>
+  <fieldset>
+    <legend>Kind of attendance</legend>
+    <label><input type="radio" name="entry.1002" value="In person"> In person</label>
+    <label><input type="radio" name="entry.1002" value="Online"> Online</label>
+  </fieldset>
+  <fieldset>
+    <legend>Duration of attendance</legend>
+    <label><input type="radio" name="entry.1003" value="1 hour"> 1 hour</label>
+    <label><input type="radio" name="entry.1003" value="2 hours"> 2 hours</label>
+  </fieldset>
+  <button type="submit"><span>Submit</span></button>
+</form>
+</body>
+</html>
+"""
+
+REQUIRED_FIELDS = ('entry.1001', 'entry.1002', 'entry.1003')
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+class FakeFormServer:
+    """Local stand-in for a Google Form, used to try out the direct submission engine.
+
+    Serves a plain HTML form on `/viewform` and records every POST to `/formResponse`.
+    Submissions missing a required field get a 400, like Google does. `latency` and
+    `fail_rate` simulate a slow or flaky endpoint for the retry and rate limit logic.
+
+    Example use:
+
+    with FakeFormServer() as server:
+        DirectSubmitter(server.url, answers=['{student_id}', 0, 0], cache_fp=None).submit('210072')
+        print(server.submissions)
+    """
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            latency: float = 0,
+            fail_rate: float = 0
+        ) -> None:
+        """
+        Parameters
+        ----------
+        port : int, optional, default 0
+            Port to listen on. 0 picks a free port.
+        latency : float, optional, default 0
+            Seconds to sleep before answering a submission.
+        fail_rate : float, optional, default 0
+            Share of submissions answered with a 503.
+        """
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.submissions: List[Dict[str, str]] = []
+        self.submitted_at: List[float] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/viewform'
+
+    def __enter__(self) -> 'FakeFormServer':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real thing.
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/viewform':
+                    return self._reply(404, 'Not found')
+                self._reply(200, FORM_HTML, 'text/html')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = parse_qs(self.rfile.read(length).decode())
+                if self.path != '/formResponse':
+                    return self._reply(404, 'Not found')
+                if server.latency:
+                    time.sleep(server.latency)
+                if random.random() < server.fail_rate:
+                    return self._reply(503, 'Service unavailable')
+                data = {key: values[0] for key, values in body.items()}
+                if any(not data.get(name) for name in REQUIRED_FIELDS):
+                    return self._reply(400, 'Missing field')
+                with server._lock:
+                    server.submissions.append(data)
+                    server.submitted_at.append(time.monotonic())
+                self._reply(200, 'Your response has been recorded.')
+
+            def _reply(self, status, body, content_type='text/plain'):
+                body = body.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve a fake form locally.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--fail-rate', type=float, default=0)
+    args = parser.parse_args()
+
+    server = FakeFormServer(port=args.port, latency=args.latency, fail_rate=args.fail_rate)
+    print(f'Serving fake form on {server.url}')
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,84 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+class FakeWorksheet:
+    def __init__(self, values: List[List]) -> None:
+        self.values = values
+
+    def get_all_records(self) -> List[Dict]:
+        header = self.values[0]
+        return [dict(zip(header, row)) for row in self.values[1:]]
+
+
+class FakeSpreadsheet:
+    def __init__(self, client: 'FakeGsheetClient', name: str) -> None:
+        self.id = name
+        self.title = name
+        self.updated = client.updated[name]
+        self._worksheets = client.spreadsheets[name]
+
+    def worksheet_by_title(self, title: str) -> FakeWorksheet:
+        return FakeWorksheet(self._worksheets[title])
+
+
+class FakeGsheetClient:
+    """In-memory stand-in for the parts of a pygsheets client `GeneralUtil` uses.
+
+    Worksheets are value arrays of strings, as the Sheets API returns them with the default
+    value render option. Every API call is counted in `calls`, and `latency` is added to it.
+
+    Example use:
+
+    client = FakeGsheetClient({'Attendance': {'Sheet1': [['id', 'score'], ['210072', '98']]}})
+    GeneralUtil.gsheets_to_files(client, [('Attendance', 'Sheet1', 'sheet1.csv')])
+    client.touch('Attendance')  # The next export with a manifest fetches it again.
+    """
+    def __init__(self, spreadsheets: Dict[str, Dict[str, List[List]]], latency: float = 0) -> None:
+        """
+        Parameters
+        ----------
+        spreadsheets : Dict[str, Dict[str, List[List]]]
+            Value arrays by spreadsheet name and worksheet title, header row first.
+        latency : float, optional, default 0
+            Seconds added to every API call.
+        """
+        self.spreadsheets = spreadsheets
+        self.latency = latency
+        self.updated = {name: _now() for name in spreadsheets}
+        self.calls = Counter()
+        self.sheet = self
+        self._lock = threading.Lock()
+
+    def open(self, name: str) -> FakeSpreadsheet:
+        self._call('open')
+        return FakeSpreadsheet(self, name)
+
+    def values_batch_get(self, spreadsheet_id: str, ranges: List[str]) -> List[Dict]:
+        self._call('values_batch_get')
+        worksheets = self.spreadsheets[spreadsheet_id]
+        # Ranges are quoted sheet titles with quotes doubled, e.g. 'Bob''s sheet'.
+        titles = [range[1:-1].replace("''", "'") if range.startswith("'") else range for range in ranges]
+        return [{'range': range, 'values': worksheets[title]} for range, title in zip(ranges, titles)]
+
+    def touch(self, name: str) -> None:
+        """Mark spreadsheet `name` as modified."""
+        time.sleep(0.001)  # Keep modified times distinct.
+        self.updated[name] = _now()
+
+    def _call(self, method: str) -> None:
+        with self._lock:
+            self.calls[method] += 1
+        time.sleep(self.latency)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
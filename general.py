@@ -1,33 +1,79 @@
 # --------------------------------------------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------------------------------------------
+from __future__ import annotations
+
+import base64
 import builtins as __builtin__
+import fnmatch
 import glob
+import gzip
+import hashlib
 import importlib.util
 import inspect
+import json
 import logging
 import mimetypes
 import os
+import queue
 import re
-import smtplib
-import ssl
+import signal
 import subprocess
 import sys
+import threading
+import time
 import types
-from email import encoders
-from email.mime.audio import MIMEAudio
-from email.mime.base import MIMEBase
-from email.mime.image import MIMEImage
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import Dict, Optional, Union
-
-import pandas as pd
-import pygsheets
-from google.oauth2 import service_account
-from IPython.core import display as ICD
+import uuid
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
 from typing_extensions import Literal
 
+
+class _LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access."""
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # Later lookups hit the copied namespace and skip __getattr__ altogether.
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def _lazy_import(name: str) -> types.ModuleType:
+    """Import `name` on first attribute access instead of now.
+
+    Keeps `import general` cheap for callers that only need e.g. `run_shell`. Unlike
+    importlib.util.LazyLoader, parent packages are not imported either.
+    """
+    return sys.modules.get(name) or _LazyModule(name)
+
+
+if TYPE_CHECKING:
+    import smtplib
+    import ssl
+
+    import google.auth.transport.requests as google_requests
+    import pandas as pd
+    import pygsheets
+    from google.oauth2 import service_account
+    from IPython.core import display as ICD
+else:
+    smtplib = _lazy_import('smtplib')
+    ssl = _lazy_import('ssl')
+
+    google_requests = _lazy_import('google.auth.transport.requests')
+    pd = _lazy_import('pandas')
+    pygsheets = _lazy_import('pygsheets')
+    service_account = _lazy_import('google.oauth2.service_account')
+    ICD = _lazy_import('IPython.core.display')
+
 # --------------------------------------------------------------------------------------------------
 # Constants
 # --------------------------------------------------------------------------------------------------
@@ -47,6 +93,45 @@ COLORS = {
     'endc': '\033[0m'
 }
 
+SMS_CARRIERS = {
+    'att':    '@mms.att.net',
+    'tmobile':' @tmomail.net',
+    'verizon':  '@vtext.com',
+    'sprint':   '@page.nextel.com',
+    'cricket':   '@mms.cricketwireless.net'
+}
+
+COMPRESSION_EXTENSIONS = {
+    'zip': '.zip',
+    'gzip': '.csv.gz',
+    'zstd': '.csv.zst',
+    'lz4': '.csv.lz4',
+}
+
+GSHEET_SCOPES = (
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+)
+
+# Process-wide google sheet credentials, keyed by service account and scopes. Clients sit on a
+# httplib2.Http, which is not thread-safe, so every thread builds its own over the shared ones.
+_gsheet_credentials: Dict[Tuple, 'service_account.Credentials'] = {}
+_gsheet_local = threading.local()
+_gsheet_lock = threading.Lock()
+# Reentrant, as the proactive refresh in get_gsheet_reader goes through the counting wrapper.
+_gsheet_refresh_lock = threading.RLock()
+_gsheet_stats = {'cache_hits': 0, 'cache_misses': 0, 'clients': 0, 'token_fetches': 0}
+
+# Everything from the first colon to the end of the line, see create_yaml_template.
+_YAML_VALUE = re.compile(':.+')
+
+# import_module cache: resolved path -> ((mtime_ns, size), module). Reentrant, as a module may
+# itself call import_module while it is executed.
+_modules: Dict[str, Tuple[Tuple[int, int], types.ModuleType]] = {}
+_modules_lock = threading.RLock()
+_module_stats = {'cache_hits': 0, 'loads': 0, 'reloads': 0}
+_module_loads: Dict[str, int] = {}
+
 # --------------------------------------------------------------------------------------------------
 # Methods
 # --------------------------------------------------------------------------------------------------
@@ -101,8 +186,8 @@ class GeneralUtil:
             else:
                 __builtin__.print(x)
 
-    @staticmethod
-    def send_sms(sender: str, password: str, receiver: Union[str,dict], msg: str, carrier: Optional[str] = 'verizon') -> None:
+    @classmethod
+    def send_sms(cls, sender: str, password: str, receiver: Union[str,dict], msg: str, carrier: Optional[str] = 'verizon') -> None:
         """Send SMS message to phone number from Gmail account.
 
         Parameters
@@ -118,41 +203,49 @@ class GeneralUtil:
         carrier : str, optional
             Carrier of phone number message is sent to, by default 'verizon'
         """
-        carriers = {
-        'att':    '@mms.att.net',
-        'tmobile':' @tmomail.net',
-        'verizon':  '@vtext.com',
-        'sprint':   '@page.nextel.com',
-        'cricket':   '@mms.cricketwireless.net'
-        }
-
         smtp_server = 'smtp.gmail.com'
         smtp_port = 587
 
-        # Replace the number with your own, or consider using an argument\dict for multiple people.
-        if isinstance(receiver, dict):
-            to_number = [
-                f"{info['number']}{carriers[info['carrier']]}"
-                for person, info in receiver.items()
-            ]
-        else:
-            to_number = f"{receiver}{carriers[carrier]}"
+        to_number = cls._sms_recipients(receiver, carrier)
 
         auth = [sender, password]
 
         # Establish a secure session with gmail's outgoing SMTP server using your gmail account
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(auth[0], auth[1])
+        with smtplib.SMTP(smtp_server, smtp_port) as server:
+            server.starttls()
+            server.login(auth[0], auth[1])
 
-        # Send text message through SMS gateway of destination number
-        server.sendmail(auth[0], to_number, msg)
+            # Send text message through SMS gateway of destination number
+            server.sendmail(auth[0], to_number, msg)
+
+    @staticmethod
+    def _sms_recipients(receiver: Union[str,dict], carrier: Optional[str] = 'verizon') -> Union[str, List[str]]:
+        """Map phone numbers to the email addresses of their carrier's SMS gateway."""
+        # Replace the number with your own, or consider using an argument\dict for multiple people.
+        if isinstance(receiver, dict):
+            return [
+                f"{info['number']}{SMS_CARRIERS[info['carrier']]}"
+                for person, info in receiver.items()
+            ]
+        return f"{receiver}{SMS_CARRIERS[carrier]}"
 
     @classmethod
-    def send_email(cls, sender, password, subject, receivers, content):
+    def send_email(
+            cls,
+            sender,
+            password,
+            subject,
+            receivers,
+            content,
+            max_attachment_bytes: Optional[int] = None,
+            compress_over: Optional[int] = None
+        ):
         """
         send emails to specific receivers
 
+        Attachments are read, compressed and base64 encoded chunk by chunk while the message
+        is sent, so memory use does not grow with their size.
+
         params:
         ----
         sender: str
@@ -167,97 +260,421 @@ class GeneralUtil:
             {'body': str,
             'attachment': [paths of files]
             }
+        max_attachment_bytes: Optional[int], default None
+            refuse to send attachments larger than this, checked before connecting
+        compress_over: Optional[int], default None
+            gzip text attachments larger than this many bytes, sent as `<name>.gz`
         """
         smtp_server = 'smtp.gmail.com'
         smtp_port = 587
 
-        msg = MIMEMultipart('mixed')
-        msg['Subject'] = subject
-        msg['From'] = sender
-        msg['To'] = receivers
-
-        msg = cls._add_email_content(msg, content)
+        chunks = cls._iter_email(sender, subject, receivers, content, max_attachment_bytes, compress_over)
 
         with smtplib.SMTP(smtp_server, smtp_port) as smtp_obj:
             smtp_obj.ehlo()
             context = ssl.create_default_context()
             smtp_obj.starttls(context=context)
             smtp_obj.login(sender, password)
-            smtp_obj.sendmail(sender, msg['To'].split(','), msg.as_string())
+            cls._stream_sendmail(smtp_obj, sender, receivers.split(','), chunks)
             smtp_obj.quit()
 
+    @classmethod
+    def _iter_email(
+            cls,
+            sender: str,
+            subject: str,
+            receivers: str,
+            content: Dict,
+            max_attachment_bytes: Optional[int] = None,
+            compress_over: Optional[int] = None
+        ) -> Iterator[bytes]:
+        """Generate the MIME message of `send_email` as CRLF terminated chunks of bytes.
+
+        Attachment sizes are checked against `max_attachment_bytes` when this is called, the
+        files themselves are only read once the chunks are consumed.
+        """
+        import email.policy
+        from email.header import Header
+        from email.mime.text import MIMEText
+
+        attachments = content.get('attachment') or []
+        for data_path in attachments:
+            size = os.path.getsize(data_path)
+            if max_attachment_bytes is not None and size > max_attachment_bytes:
+                raise Exception(f'{data_path} is {size} bytes, over the {max_attachment_bytes} bytes limit.')
+
+        def chunks():
+            boundary = f'==============={uuid.uuid4().hex}=='
+            yield (
+                f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n'
+                'MIME-Version: 1.0\r\n'
+                f'Subject: {Header(subject, "utf-8").encode()}\r\n'
+                f'From: {sender}\r\n'
+                f'To: {receivers}\r\n\r\n'
+            ).encode()
+
+            if content.get('body'):
+                yield f'--{boundary}\r\n'.encode()
+                yield MIMEText(content['body']).as_bytes(policy=email.policy.SMTP) + b'\r\n'
+
+            for data_path in attachments:
+                filename = data_path.split('/')[-1]
+                ctype, encoding = mimetypes.guess_type(filename)
+                if ctype is None or encoding is not None:
+                    ctype = "application/octet-stream"
+                data = cls._iter_file(data_path)
+                if compress_over is not None and ctype.startswith('text/') \
+                        and os.path.getsize(data_path) > compress_over:
+                    filename, ctype, data = f'{filename}.gz', 'application/gzip', cls._iter_gzip(data)
+
+                yield (
+                    f'--{boundary}\r\n'
+                    f'Content-Type: {ctype}\r\n'
+                    'MIME-Version: 1.0\r\n'
+                    'Content-Transfer-Encoding: base64\r\n'
+                    f'Content-Disposition: attachment; filename="{filename}"\r\n\r\n'
+                ).encode()
+                yield from cls._iter_base64(data)
+            yield f'--{boundary}--\r\n'.encode()
+
+        return chunks()
+
+    @staticmethod
+    def _iter_file(data_path: str, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+        with open(data_path, 'rb') as fp:
+            while True:
+                chunk = fp.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    @staticmethod
+    def _iter_gzip(chunks: Iterable[bytes], compresslevel: int = 6) -> Iterator[bytes]:
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)  # 31 writes a gzip header.
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    def _iter_base64(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Base64 encode a stream into 76 character CRLF terminated lines."""
+        buffer = b''
+        for chunk in chunks:
+            buffer += chunk
+            n = len(buffer) - len(buffer) % 57  # 57 bytes encode to one 76 character line.
+            if n:
+                yield base64.encodebytes(buffer[:n]).replace(b'\n', b'\r\n')
+                buffer = buffer[n:]
+        if buffer:
+            yield base64.encodebytes(buffer).replace(b'\n', b'\r\n')
+
     @staticmethod
-    def _add_email_content(msg, content):
+    def _stream_sendmail(smtp: smtplib.SMTP, sender: str, to_addrs: List[str], chunks: Iterable[bytes]) -> Dict:
+        """Like `smtplib.SMTP.sendmail`, but sends the message as it is being generated.
+
+        Every chunk must end on a line boundary so that dot-stuffing can be applied per chunk.
         """
-        add email content
+        smtp.ehlo_or_helo_if_needed()
+        code, resp = smtp.mail(sender)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, resp, sender)
+        refused = {}
+        for addr in to_addrs:
+            code, resp = smtp.rcpt(addr)
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        if len(refused) == len(to_addrs):
+            smtp.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
 
-        params:
-        ----
-        msg: email.mime.multipart.MIMEMultipart, 
-        content: Dict
+        code, resp = smtp.docmd('data')
+        if code != 354:
+            raise smtplib.SMTPDataError(code, resp)
+        for chunk in chunks:
+            smtp.send(re.sub(rb'(?m)^\.', b'..', chunk))
+        smtp.send(b'.\r\n')
+        code, resp = smtp.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    class Notifier:
+        """Send emails and SMS over one long-lived, authenticated SMTP connection.
+
+        Messages are queued and sent by a background thread, so callers never wait on the mail
+        server. The thread drains the queue in batches, sends each batch over the one connection
+        and reconnects when the server drops the session. Every `send_*` call is delivered as
+        its own transaction unless `merge_identical` is set.
+
+        Example use:
+
+        with GeneralUtil.Notifier(sender, password) as notifier:
+            notifier.send_sms(persons, 'Successfully Filled Google Form.')
+            notifier.send_email('Report', 'a@b.com,c@d.com', {'body': 'Done', 'attachment': []})
         """
-        if not content.keys():
-            print('no content to add')
-            return
+        def __init__(
+                self,
+                sender: str,
+                password: Optional[str],
+                host: str = 'smtp.gmail.com',
+                port: int = 587,
+                starttls: bool = True,
+                batch_size: int = 50,
+                batch_wait: float = 0.2,
+                max_queue: int = 1000,
+                idle_timeout: float = 240,
+                merge_identical: bool = False,
+                logger: Optional[logging.Logger] = None
+            ):
+            """
+            Parameters
+            ----------
+            password : Optional[str]
+                Password of the sender account. None skips login, e.g. for a local debugging
+                server such as `python -m aiosmtpd -n`.
+            starttls : bool, optional, default True
+                Upgrade the connection with STARTTLS before logging in.
+            batch_size : int, optional, default 50
+                Most queued messages sent in one go.
+            batch_wait : float, optional, default 0.2
+                Seconds to wait for more messages once the first of a batch arrived.
+            max_queue : int, optional, default 1000
+                Queue size after which `send_*` blocks.
+            idle_timeout : float, optional, default 240
+                Seconds of inactivity after which the connection is checked with NOOP before use.
+            merge_identical : bool, optional, default False
+                Send identical text messages of one batch as a single transaction to all of their
+                recipients, each recipient once. Repeats of the same alert within `batch_wait`
+                are then delivered only once.
+            """
+            self.sender = sender
+            self.password = password
+            self.host = host
+            self.port = port
+            self.starttls = starttls
+            self.batch_size = batch_size
+            self.batch_wait = batch_wait
+            self.idle_timeout = idle_timeout
+            self.merge_identical = merge_identical
+            self.logger = logger or logging.getLogger(__name__)
+            self.stats = {'sent': 0, 'failed': 0, 'connects': 0}
 
-        try:
-            body = content['body']
-            msg_text = MIMEText(body)
-            msg.attach(msg_text)
-        except Exception:
-            print('Email has no body content.')
-        path_of_files = content['attachment']
-
-        if not path_of_files:
-            print('Email has no attachments.')
-            return msg
-
-        for data_path in path_of_files:
-                
-            filename = data_path.split('/')[-1]
-            ctype, encoding = mimetypes.guess_type(filename)
-            if ctype is None or encoding is not None:
-                ctype = "application/octet-stream"
-            maintype, subtype = ctype.split('/', 1)
-
-            if maintype == 'text':
-                with open(data_path) as fp:
-                    attachment = MIMEText(fp.read(), _subtype=subtype)
-            elif maintype == 'image':
-                with open(data_path, 'rb') as fp:
-                    attachment = MIMEImage(fp.read(), _subtype=subtype)
-            elif maintype == 'audio':
-                with open(data_path, 'rb') as fp:
-                    attachment = MIMEAudio(fp.read(), _subtype=subtype)
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._smtp: Optional[smtplib.SMTP] = None
+            self._last_used = 0.0
+            self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+            self._thread.start()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            self.close()
+
+        def send(self, to_addrs: Union[str, List[str]], msg: Union[str, Callable[[], Iterable[bytes]]]) -> None:
+            """Queue an already formatted message, or a callable generating it in chunks."""
+            if not self._thread.is_alive():
+                raise Exception('Notifier is closed.')
+            self._queue.put((to_addrs, msg))
+
+        def send_sms(self, receiver: Union[str, dict], msg: str, carrier: Optional[str] = 'verizon') -> None:
+            """Queue an SMS, see `GeneralUtil.send_sms`."""
+            self.send(GeneralUtil._sms_recipients(receiver, carrier), msg)
+
+        def send_email(
+                self,
+                subject: str,
+                receivers: str,
+                content: Dict,
+                max_attachment_bytes: Optional[int] = None,
+                compress_over: Optional[int] = None
+            ) -> None:
+            """Queue an email, see `GeneralUtil.send_email`.
+
+            The message is only generated, and its attachments streamed, when it is sent.
+            """
+            # Check attachment sizes now, so the caller gets the error instead of the worker thread.
+            GeneralUtil._iter_email(self.sender, subject, receivers, content, max_attachment_bytes)
+            msg = partial(
+                GeneralUtil._iter_email,
+                self.sender, subject, receivers, content, max_attachment_bytes, compress_over
+            )
+            self.send(receivers.split(','), msg)
+
+        def flush(self) -> None:
+            """Block until every queued message was sent or given up on."""
+            self._queue.join()
+
+        def close(self) -> None:
+            """Send what is left in the queue, then close the connection."""
+            if self._thread.is_alive():
+                self._queue.put(None)
+                self._thread.join()
+
+        def _run(self) -> None:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                deadline = time.monotonic() + self.batch_wait
+                while item is not None and len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+
+                messages = [message for message in batch if message is not None]
+                if messages:
+                    self._send_batch(messages)
+                for _ in batch:
+                    self._queue.task_done()
+                if len(messages) < len(batch):
+                    self._disconnect()
+                    return
+
+        def _send_batch(self, messages: List[Tuple[Union[str, List[str]], Union[str, Callable]]]) -> None:
+            transactions = []
+            merged: Dict[str, List[str]] = {}
+            for to_addrs, msg in messages:
+                to_addrs = [to_addrs] if isinstance(to_addrs, str) else list(to_addrs)
+                if not self.merge_identical or callable(msg):
+                    transactions.append((msg, to_addrs))
+                elif msg in merged:
+                    recipients = merged[msg]
+                    recipients.extend(addr for addr in to_addrs if addr not in recipients)
+                else:
+                    merged[msg] = to_addrs
+                    transactions.append((msg, to_addrs))
+
+            for msg, to_addrs in transactions:
+                try:
+                    self._sendmail(to_addrs, msg)
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    self.logger.warning(f'SMTP connection lost, reconnecting: {e}')
+                    self._disconnect()
+                    try:
+                        self._sendmail(to_addrs, msg)
+                    except Exception as e:
+                        self._failed(to_addrs, e)
+                except Exception as e:
+                    self._failed(to_addrs, e)
+
+        def _sendmail(self, to_addrs: List[str], msg: Union[str, Callable[[], Iterable[bytes]]]) -> None:
+            smtp = self._connection()
+            if callable(msg):
+                GeneralUtil._stream_sendmail(smtp, self.sender, to_addrs, msg())
             else:
-                with open(data_path, 'rb') as fp:
-                    attachment = MIMEBase(maintype, subtype)
-                    attachment.set_payload(fp.read())
-                encoders.encode_base64(attachment)
+                smtp.sendmail(self.sender, to_addrs, msg)
+            self._last_used = time.monotonic()
+            self.stats['sent'] += 1
 
-            attachment.add_header('Content-Disposition', 'attachment', filename=filename)
-            msg.attach(attachment)
-        return msg
+        def _failed(self, to_addrs: List[str], e: Exception) -> None:
+            self.stats['failed'] += 1
+            self.logger.error(f'Failed to send message to {to_addrs}: {e}')
+
+        def _connection(self) -> smtplib.SMTP:
+            if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                try:
+                    self._smtp.noop()
+                except (smtplib.SMTPException, OSError):
+                    self._disconnect()
+            if self._smtp is None:
+                smtp = smtplib.SMTP(self.host, self.port)
+                smtp.ehlo()
+                if self.starttls:
+                    smtp.starttls(context=ssl.create_default_context())
+                    smtp.ehlo()
+                if self.password is not None:
+                    smtp.login(self.sender, self.password)
+                self._smtp = smtp
+                self.stats['connects'] += 1
+            return self._smtp
+
+        def _disconnect(self) -> None:
+            if self._smtp is None:
+                return
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
 
     @staticmethod
-    def get_gsheet_reader(cred: Dict) -> pygsheets.client.Client:
+    def get_gsheet_reader(
+            cred: Dict,
+            scopes: Tuple[str, ...] = GSHEET_SCOPES,
+            refresh_margin: float = 300
+        ) -> pygsheets.client.Client:
         """Get a google sheet reader to interact with google sheets.
+
+        The key is parsed once per service account and scopes for the whole process, and its
+        access token is refreshed ahead of expiry whenever a reader is handed out. Readers are
+        cached per thread, as their HTTP transport must not be shared between threads, so call
+        this from every worker thread rather than passing one reader around.
         
         Parameters
         ----------
         cred : Dict
             dictionary containing the private key obtained for a service_account to connect
             with Google Drive / Google Spreadsheets API.
+        scopes : Tuple[str, ...], optional, default GSHEET_SCOPES
+            OAuth scopes requested for the service account.
+        refresh_margin : float, optional, default 300
+            Refresh the token when it expires within this many seconds.
         """
-        SCOPES = (
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        )
-        cred = service_account.Credentials.from_service_account_info(cred, scopes=SCOPES)
-        return pygsheets.authorize(custom_credentials=cred)
+        key = (cred.get('client_email'), cred.get('private_key_id'), tuple(scopes))
+        with _gsheet_lock:
+            credentials = _gsheet_credentials.get(key)
+            if credentials is None:
+                _gsheet_stats['cache_misses'] += 1
+                credentials = service_account.Credentials.from_service_account_info(cred, scopes=scopes)
+                GeneralUtil._count_token_fetches(credentials)
+                _gsheet_credentials[key] = credentials
+            else:
+                _gsheet_stats['cache_hits'] += 1
+
+        # Checked under the lock, so threads arriving together don't all fetch a token.
+        with _gsheet_refresh_lock:
+            expiry = credentials.expiry
+            if expiry is None or (expiry - datetime.utcnow()).total_seconds() < refresh_margin:
+                credentials.refresh(google_requests.Request())
+
+        clients = _gsheet_local.__dict__.setdefault('clients', {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = pygsheets.authorize(custom_credentials=credentials)
+            with _gsheet_lock:
+                _gsheet_stats['clients'] += 1
+        return client
 
     @staticmethod
+    def _count_token_fetches(credentials: service_account.Credentials) -> None:
+        """Serialise and count every token refresh of `credentials`.
+
+        Wraps the instance's `refresh`, so refreshes the transport makes on its own, on expiry
+        or after a 401, are counted too.
+        """
+        refresh = credentials.refresh
+
+        def counted_refresh(request) -> None:
+            with _gsheet_refresh_lock:
+                refresh(request)
+            with _gsheet_lock:
+                _gsheet_stats['token_fetches'] += 1
+
+        credentials.refresh = counted_refresh
+
+    @staticmethod
+    def gsheet_client_stats() -> Dict[str, int]:
+        """Cache hits, misses, clients built and token fetches of `get_gsheet_reader` in this process."""
+        with _gsheet_lock:
+            return dict(_gsheet_stats, credentials=len(_gsheet_credentials))
+
+    @classmethod
     def gsheet_to_file(
+            cls,
             greader: pygsheets.client.Client,
             fp: str,
             spreadsheet_name: str,
@@ -277,9 +694,104 @@ class GeneralUtil:
         format : str, optional, default 'csv'
             Type of file to save. Possible values: ['csv', 'ftr'].
         """
+        if format not in ('csv', 'ftr'):
+            raise Exception('format only supports updating ".csv" and ".ftr" files.')
         spreadsh = greader.open(spreadsheet_name)
         worksh = spreadsh.worksheet_by_title(worksheet_name)
         df = pd.DataFrame(worksh.get_all_records())
+        cls._write_frame(df, fp, format)
+
+    @classmethod
+    def gsheets_to_files(
+            cls,
+            greader: pygsheets.client.Client,
+            exports: Iterable[Tuple[str, str, str]],
+            format: str = 'csv',
+            manifest_fp: Optional[str] = None
+        ) -> Dict[str, str]:
+        """Save many google sheets to local files with one batched read per spreadsheet.
+
+        Every spreadsheet is opened once and all of its requested worksheets are fetched in a
+        single `values.batchGet` call. Frames are built straight from the returned value arrays.
+        With `manifest_fp`, spreadsheets whose last modified time did not change since the
+        previous export are skipped.
+
+        Parameters
+        ----------
+        exports : Iterable[Tuple[str, str, str]]
+            (spreadsheet_name, worksheet_name, fp) of every worksheet to save.
+        format : str, optional, default 'csv'
+            Type of file to save. Possible values: ['csv', 'ftr'].
+        manifest_fp : Optional[str], optional, default None
+            JSON file recording the spreadsheet modified time of every exported file. Default
+            of None always exports.
+
+        Returns
+        -------
+        Dict[str, str]
+            'exported' or 'skipped' for every fp.
+        """
+        if format not in ('csv', 'ftr'):
+            raise Exception('format only supports updating ".csv" and ".ftr" files.')
+        manifest = {}
+        if manifest_fp and os.path.exists(manifest_fp):
+            with open(manifest_fp) as f:
+                manifest = json.load(f)
+
+        by_spreadsheet: Dict[str, List[Tuple[str, str]]] = {}
+        for spreadsheet_name, worksheet_name, fp in exports:
+            by_spreadsheet.setdefault(spreadsheet_name, []).append((worksheet_name, fp))
+
+        status = {}
+        for spreadsheet_name, worksheets in by_spreadsheet.items():
+            spreadsh = greader.open(spreadsheet_name)
+            revision = spreadsh.updated if manifest_fp else None
+            todo = []
+            for worksheet_name, fp in worksheets:
+                if revision is not None and manifest.get(fp) == revision and os.path.exists(fp):
+                    status[fp] = 'skipped'
+                else:
+                    todo.append((worksheet_name, fp))
+            if not todo:
+                continue
+
+            # Quotes in sheet titles are escaped by doubling them in A1 notation.
+            ranges = ["'{}'".format(worksheet_name.replace("'", "''")) for worksheet_name, _ in todo]
+            value_ranges = greader.sheet.values_batch_get(spreadsh.id, ranges)
+            for (worksheet_name, fp), value_range in zip(todo, value_ranges):
+                df = cls._values_to_frame(value_range.get('values', []))
+                cls._write_frame(df, fp, format)
+                status[fp] = 'exported'
+                if revision is not None:
+                    manifest[fp] = revision
+
+        if manifest_fp:
+            with open(manifest_fp, 'w') as f:
+                json.dump(manifest, f, indent=2)
+        return status
+
+    @staticmethod
+    def _values_to_frame(values: List[List]) -> pd.DataFrame:
+        """Build a frame from a worksheet's value array, first row as header.
+
+        Columns that are entirely numeric are converted, like `get_all_records` does per cell.
+        """
+        if not values:
+            return pd.DataFrame()
+        header, rows = values[0], values[1:]
+        width = len(header)
+        # The API drops trailing empty cells of every row.
+        rows = [row[:width] + [''] * (width - len(row)) for row in rows]
+        df = pd.DataFrame(rows, columns=header)
+        for col in df.columns:
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass
+        return df
+
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, fp: str, format: str) -> None:
         if format == 'csv':
             df.to_csv(fp, index=False)
         elif format == 'ftr':
@@ -287,68 +799,157 @@ class GeneralUtil:
         else:
             raise Exception('format only supports updating ".csv" and ".ftr" files.')
 
-    @staticmethod
+    @classmethod
     def to_csv(
-            df: pd.DataFrame,
+            cls,
+            df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
             zip_name: str,
             dir: str,
             file_name: Optional[str] = None,
             method: str = 'zip',
-            compresslevel: int = 9
-        ) -> None:
+            compresslevel: int = 9,
+            chunksize: int = 100_000,
+            threads: int = 0
+        ) -> Dict[str, float]:
         """Save dataframe to csv file with compression.
 
+        The csv is generated and compressed chunk by chunk, so an iterator of dataframes, e.g.
+        `read_files(..., chunked=True)`, is written without ever being held in memory at once.
+
         Parameters
         ----------
+        df : Union[pd.DataFrame, Iterable[pd.DataFrame]]
+            Dataframe, or iterator of dataframes with the same columns, to save.
         zip_name : str
-            Name of the .zip file that the dataframe will be compressed into.
+            Name of the compressed file that the dataframe will be compressed into.
         dir : str
-            File path of where to save the .zip.
+            File path of where to save the compressed file.
         file_name : Optional[str], optional, default None
             Name of the file within the .zip file post-extraction. Default of None will have
-            the same name as the zip_name.
+            the same name as the zip_name. Only used by the 'zip' method.
         method : str, optional, default 'zip'
-            Type of compression.
+            Type of compression. Possible values: ['zip', 'gzip', 'zstd', 'lz4']. 'zstd' needs
+            the zstandard package and 'lz4' the lz4 package.
         compresslevel : int, optional, default 9
             Degree of compression where higher number indicates higher compression.
+        chunksize : int, optional, default 100_000
+            Number of rows converted to csv at a time.
+        threads : int, optional, default 0
+            Compression threads for 'zstd', -1 uses all cores. Other methods are single-threaded.
+
+        Returns
+        -------
+        Dict[str, float]
+            Rows written, raw and compressed bytes, seconds, throughput in MB/s of raw csv and
+            compression ratio.
         """
         # Process arguments.
         if dir[-1] == '/':
             dir = dir[:-1]
-        if re.search('\.csv', zip_name):
-            zip_name = re.sub('\.csv', '', zip_name)
+        if re.search(r'\.csv', zip_name):
+            zip_name = re.sub(r'\.csv', '', zip_name)
         if file_name is None:
             file_name = zip_name
+        if method not in COMPRESSION_EXTENSIONS:
+            raise Exception(f'method only supports {list(COMPRESSION_EXTENSIONS)}.')
 
-        compress_param = {
-            'archive_name': f'{file_name}.csv',
-            'method': method,
-            'compresslevel': compresslevel
+        fp = f'{dir}/{zip_name}{COMPRESSION_EXTENSIONS[method]}'
+        chunks = [df] if isinstance(df, pd.DataFrame) else df
+        start = time.perf_counter()
+        rows = raw_bytes = 0
+        with cls._open_compressed(fp, method, compresslevel, threads, f'{file_name}.csv') as out:
+            header = True
+            for chunk in chunks:
+                for i in range(0, max(len(chunk), 1), chunksize):
+                    data = chunk.iloc[i:i + chunksize].to_csv(index=False, header=header).encode()
+                    header = False
+                    out.write(data)
+                    raw_bytes += len(data)
+                rows += len(chunk)
+        seconds = time.perf_counter() - start
+
+        compressed_bytes = os.path.getsize(fp)
+        stats = {
+            'rows': rows,
+            'raw_bytes': raw_bytes,
+            'compressed_bytes': compressed_bytes,
+            'seconds': seconds,
+            'mb_per_s': raw_bytes / 1024**2 / seconds if seconds else float('inf'),
+            'ratio': raw_bytes / compressed_bytes if compressed_bytes else float('inf'),
         }
-        df.to_csv(f'{dir}/{zip_name}.zip', compression=compress_param, index=False)
+        logging.getLogger(__name__).info(
+            f'Wrote {fp}: {rows} rows, {stats["mb_per_s"]:.1f} MB/s, ratio {stats["ratio"]:.2f}.'
+        )
+        return stats
+
+    @staticmethod
+    @contextmanager
+    def _open_compressed(fp: str, method: str, compresslevel: int, threads: int, archive_name: str):
+        """Open `fp` for incremental writes through the `method` codec."""
+        if method == 'zip':
+            with zipfile.ZipFile(fp, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+                with zf.open(archive_name, 'w', force_zip64=True) as out:
+                    yield out
+        elif method == 'gzip':
+            with gzip.open(fp, 'wb', compresslevel=compresslevel) as out:
+                yield out
+        elif method == 'zstd':
+            import zstandard
+            compressor = zstandard.ZstdCompressor(level=compresslevel, threads=threads)
+            with open(fp, 'wb') as f, compressor.stream_writer(f) as out:
+                yield out
+        elif method == 'lz4':
+            import lz4.frame
+            with lz4.frame.open(fp, 'wb', compression_level=compresslevel) as out:
+                yield out
 
     @staticmethod
-    def import_module(module_filepath: str):
+    def import_module(module_filepath: str, reload: bool = False) -> types.ModuleType:
         """Import module to a variable from a specific filepath.
 
+        The module is executed once per process and handed out again on later calls, keyed by
+        its resolved path. It is executed again, as a new module object, only when the file's
+        modification time or size changed. Safe to call from several threads.
+
         Parameters
         ----------
         module_filepath : str
             Filepath leading to the module.
+        reload : bool, optional, default False
+            Execute the module again even if the file did not change.
         """
-        module_name = module_filepath.split('/')[-1]
-        module_dir = re.sub(module_name, '', module_filepath)
-        spec = importlib.util.spec_from_file_location(module_name, f'{module_dir}{module_name}')
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module
+        path = os.path.realpath(module_filepath)
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size)
+        with _modules_lock:
+            cached = _modules.get(path)
+            if cached is not None and cached[0] == version and not reload:
+                _module_stats['cache_hits'] += 1
+                return cached[1]
+
+            module_name = os.path.splitext(os.path.basename(path))[0]
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+            _modules[path] = (version, module)
+            _module_stats['reloads' if cached is not None else 'loads'] += 1
+            _module_loads[path] = _module_loads.get(path, 0) + 1
+            return module
 
     @staticmethod
-    def create_yaml_template(input_fp: str, output_fp: str) -> None:
+    def import_module_stats() -> Dict:
+        """Cache hits, first loads and reloads of `import_module`, and executions per path."""
+        with _modules_lock:
+            return dict(_module_stats, modules=dict(_module_loads))
+
+    @classmethod
+    def create_yaml_template(cls, input_fp: str, output_fp: str) -> None:
         """Creates empty .yaml template from a .yaml file.
 
         Useful for converting a filled out environment .yaml file into an empty template for users
-        to clone into their directories without seeing anyone else's secrets.
+        to clone into their directories without seeing anyone else's secrets. The file is streamed
+        line by line and the template replaces `output_fp` only once it is complete.
         
         Parameters
         ----------
@@ -357,33 +958,263 @@ class GeneralUtil:
         output_fp : str
             Output filepath of the empty .yaml template.
         """
-        with open(input_fp) as fp:
-            env = fp.readlines()
+        tmp_fp = f'{output_fp}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(input_fp) as src, open(tmp_fp, 'w') as dst:
+                dst.writelines(cls._yaml_template_lines(src))
+            os.replace(tmp_fp, output_fp)
+        finally:
+            if os.path.exists(tmp_fp):
+                os.remove(tmp_fp)
 
-        template = []
-        for line in env:
+    @classmethod
+    def create_yaml_templates(
+            cls,
+            input_dir: str,
+            output_dir: str,
+            patterns: Iterable[str] = ('*.yaml', '*.yml'),
+            max_workers: Optional[int] = None,
+            manifest_fp: Optional[str] = None,
+            force: bool = False
+        ) -> Dict[str, float]:
+        """Create templates of every .yaml file under `input_dir`, mirroring the tree in `output_dir`.
+
+        Files are processed in parallel. A file whose sha256 matches the one recorded when its
+        template was last generated, and whose template still exists, is skipped.
+
+        Parameters
+        ----------
+        patterns : Iterable[str], optional, default ('*.yaml', '*.yml')
+            Glob patterns of the file names to convert.
+        max_workers : Optional[int], optional, default None
+            Number of threads. Default of None lets ThreadPoolExecutor decide.
+        manifest_fp : Optional[str], optional, default None
+            JSON file of source hashes. Default of None keeps it in `output_dir`.
+        force : bool, optional, default False
+            Regenerate every template regardless of the manifest.
+
+        Returns
+        -------
+        Dict[str, float]
+            Files found, generated, skipped and failed, seconds and files per second.
+        """
+        start = time.perf_counter()
+        if manifest_fp is None:
+            manifest_fp = os.path.join(output_dir, '.yaml_templates.json')
+        manifest = {}
+        if not force and os.path.exists(manifest_fp):
+            with open(manifest_fp) as f:
+                manifest = json.load(f)
+
+        patterns = list(patterns)
+        rel_fps = []
+        output_real = os.path.realpath(output_dir)
+        for root, dirs, names in os.walk(input_dir):
+            # Don't pick up our own templates when output_dir is inside input_dir.
+            dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(root, d)) != output_real]
+            rel_fps += [
+                os.path.relpath(os.path.join(root, name), input_dir)
+                for name in names
+                if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+            ]
+
+        def process(rel_fp: str) -> Tuple[str, str, Optional[str]]:
+            input_fp, output_fp = os.path.join(input_dir, rel_fp), os.path.join(output_dir, rel_fp)
+            digest = hashlib.sha256()
+            with open(input_fp, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            digest = digest.hexdigest()
+            if manifest.get(rel_fp) == digest and os.path.exists(output_fp):
+                return rel_fp, 'skipped', digest
+            os.makedirs(os.path.dirname(output_fp) or '.', exist_ok=True)
+            cls.create_yaml_template(input_fp, output_fp)
+            return rel_fp, 'generated', digest
+
+        counts = {'generated': 0, 'skipped': 0, 'failed': 0}
+        logger = logging.getLogger(__name__)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(process, rel_fp): rel_fp for rel_fp in rel_fps}
+            for future, rel_fp in futures.items():
+                try:
+                    _, status, digest = future.result()
+                except (OSError, UnicodeDecodeError) as e:
+                    counts['failed'] += 1
+                    logger.error(f'Failed to create template of {rel_fp}: {e}')
+                    continue
+                counts[status] += 1
+                manifest[rel_fp] = digest
+
+        os.makedirs(os.path.dirname(manifest_fp) or '.', exist_ok=True)
+        with open(manifest_fp, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        seconds = time.perf_counter() - start
+        stats = {'files': len(rel_fps), **counts, 'seconds': seconds, 'files_per_s': len(rel_fps) / seconds}
+        logger.info(
+            f'Templates of {input_dir}: {counts["generated"]} generated, {counts["skipped"]} unchanged, '
+            f'{counts["failed"]} failed, {stats["files_per_s"]:.0f} files/s.'
+        )
+        return stats
+
+    @staticmethod
+    def _yaml_template_lines(lines: Iterable[str]) -> Iterator[str]:
+        """Blank out the values of `lines`, keeping comments, blank lines and list brackets."""
+        for line in lines:
             if line == '\n':
-                template.append('\n')
-            elif re.search('#', line) is not None:
-                template.append(line)
-            elif re.search(':', line) is None:
+                yield '\n'
+            elif '#' in line:
+                yield line
+            elif ':' not in line:
                 continue
+            elif '[' in line:
+                yield _YAML_VALUE.sub(': []', line)
             else:
-                if re.search('\[', line) is not None:
-                    line = re.sub(':.+', ': []', line)
-                else:
-                    line = re.sub(':.+', ':', line)
-                template.append(line)
+                yield _YAML_VALUE.sub(':', line)
+
+    @dataclass
+    class ShellResult:
+        """Outcome of one `run_shell` command."""
+        cmd: str
+        returncode: Optional[int]
+        duration: float
+        stdout_bytes: int
+        stderr_bytes: int
+        timed_out: bool = False
+        stderr_tail: str = ''
+
+        @property
+        def ok(self) -> bool:
+            return self.returncode == 0 and not self.timed_out
+
+    @classmethod
+    def run_shell(
+            cls,
+            cmd: str,
+            logger: logging.Logger,
+            timeout: Optional[float] = None,
+            kill_grace: float = 5,
+            label: Optional[str] = None,
+            tail_lines: int = 50
+        ) -> ShellResult:
+        """Wrapper around shell command to log its output as it happens and any unexpected errors.
+
+        stdout and stderr are forwarded to `logger` line by line while the command runs, only
+        the last `tail_lines` of stderr are kept for the error message. The command runs in its
+        own process group, so on timeout the shell and everything it started are killed.
+
+        Parameters
+        ----------
+        cmd : str
+            Shell command to run.
+        logger : logging.Logger
+            stdout lines are logged at INFO, stderr lines at WARNING.
+        timeout : Optional[float], optional, default None
+            Seconds after which the process group gets SIGTERM.
+        kill_grace : float, optional, default 5
+            Seconds between SIGTERM and SIGKILL for a process group that does not exit.
+        label : Optional[str], optional, default None
+            Prefix of every forwarded line, to tell concurrent commands apart.
+        tail_lines : int, optional, default 50
+            Lines of stderr kept for the error message.
+
+        Returns
+        -------
+        ShellResult
+            Exit code, duration, bytes of output and whether the command timed out.
+        """
+        prefix = f'[{label}] ' if label else ''
+        counts = {'stdout': 0, 'stderr': 0}
+        stderr_tail = deque(maxlen=tail_lines)
+
+        def forward(name: str, stream, level: int) -> None:
+            # Bounded reads so a line without newlines can't grow without limit.
+            for line in iter(lambda: stream.readline(64 * 1024), b''):
+                counts[name] += len(line)
+                text = line.decode(errors='replace').rstrip('\r\n')
+                if name == 'stderr':
+                    stderr_tail.append(text)
+                logger.log(level, f'{prefix}{text}')
+            stream.close()
+
+        start = time.perf_counter()
+        p = subprocess.Popen(
+            cmd, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+        readers = [
+            threading.Thread(target=forward, args=('stdout', p.stdout, logging.INFO), daemon=True),
+            threading.Thread(target=forward, args=('stderr', p.stderr, logging.WARNING), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        timed_out = False
+        try:
+            p.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            logger.error(f'{prefix}Timed out after {timeout} seconds, killing: {cmd}')
+            cls._kill_process_group(p, kill_grace)
+        except BaseException:
+            # E.g. KeyboardInterrupt, don't leave the command running behind us.
+            cls._kill_process_group(p, kill_grace)
+            raise
+        for reader in readers:
+            # A daemonized grandchild may hold the pipes open, don't wait on it forever.
+            reader.join(timeout=kill_grace)
+
+        result = cls.ShellResult(
+            cmd, p.returncode, time.perf_counter() - start, counts['stdout'], counts['stderr'],
+            timed_out, '\n'.join(stderr_tail)
+        )
+        if p.returncode != 0 and not timed_out:
+            logger.error(f'{prefix}{cmd} exited with {p.returncode}\n{result.stderr_tail}')
+        return result
 
-        with open(output_fp, 'w') as f:
-            f.write(''.join(template))
+    @classmethod
+    def run_shells(
+            cls,
+            cmds: Iterable[str],
+            logger: logging.Logger,
+            max_workers: int = 4,
+            **kwargs
+        ) -> List[ShellResult]:
+        """Run `cmds` concurrently with `run_shell`, at most `max_workers` at a time.
+
+        Forwarded lines are prefixed with the index of their command. Keyword arguments, e.g.
+        `timeout`, are passed on to `run_shell`.
+
+        Returns
+        -------
+        List[ShellResult]
+            One result per command, in input order.
+        """
+        cmds = list(cmds)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(cls.run_shell, cmd, logger, label=str(i), **kwargs)
+                for i, cmd in enumerate(cmds)
+            ]
+            results = [future.result() for future in futures]
+        failed = sum(not result.ok for result in results)
+        if failed:
+            logger.error(f'{failed} of {len(results)} commands failed.')
+        return results
 
     @staticmethod
-    def run_shell(cmd: str, logger: logging.Logger) -> None:
-        """Wrapper around shell command to log any unexpected errors."""
-        p = subprocess.run(cmd, capture_output=True, shell=True)
-        if p.returncode != 0:
-            logger.error(f'{p.args}\n{p.stderr.decode()}')
+    def _kill_process_group(p: subprocess.Popen, grace: float) -> None:
+        """SIGTERM the process group of `p`, then SIGKILL it if it is still alive after `grace`."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(p.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                p.wait(timeout=grace)
+                return
+            except subprocess.TimeoutExpired:
+                continue
 
     class HidePrints:
         """Suppress print statements.
@@ -407,17 +1238,167 @@ class GeneralUtil:
             sys.stdout.close()
             sys.stdout = self._original_stdout
 
-    @staticmethod
+    class FileCache:
+        """Persistent cache of parsed files for `read_files`.
+
+        Every file is stored as feather, keyed by its path, size and modification time, so a
+        repeat `read_files` on a growing directory only parses new or changed files. The least
+        recently used entries are evicted once the cache grows past `max_bytes`.
+
+        Example use:
+
+        cache = GeneralUtil.FileCache('/tmp/read_files_cache', max_bytes=2 * 1024**3)
+        df = GeneralUtil.read_files('data/daily', cache=cache)
+        print(cache.stats())
+        """
+        def __init__(self, cache_dir: str, max_bytes: Optional[int] = None):
+            """
+            Parameters
+            ----------
+            cache_dir : str
+                Directory holding the cached files and their index.
+            max_bytes : Optional[int], optional, default None
+                Size limit of the cache on disk. Default of None never evicts.
+            """
+            self.cache_dir = cache_dir
+            self.max_bytes = max_bytes
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.errors = 0
+            self.logger = logging.getLogger(__name__)
+            self._lock = threading.Lock()
+            self._index_fp = os.path.join(cache_dir, 'index.json')
+
+            os.makedirs(cache_dir, exist_ok=True)
+            index = {}
+            if os.path.exists(self._index_fp):
+                with open(self._index_fp) as f:
+                    index = json.load(f)
+            # Least recently used first, so eviction pops from the front and a hit moves an entry
+            # to the end. Lookups by path and the total size are kept alongside, so `put` costs
+            # the same with 10 entries as with 10,000.
+            self._index = OrderedDict(sorted(index.items(), key=lambda kv: kv[1]['last_used']))
+            self._keys = {(entry['path'], entry['variant']): key for key, entry in self._index.items()}
+            self._bytes = sum(entry['bytes'] for entry in self._index.values())
+
+        def get(self, filepath: str, variant: str = '') -> Optional[pd.DataFrame]:
+            """Return the cached frame of `filepath`, or None if it is new or changed."""
+            key = self._key(filepath, variant)
+            with self._lock:
+                entry = self._index.get(key)
+                if entry is None or not os.path.exists(self._entry_fp(key)):
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                entry['last_used'] = time.time()
+                self._index.move_to_end(key)
+            return pd.read_feather(self._entry_fp(key))
+
+        def put(self, filepath: str, df: pd.DataFrame, variant: str = '') -> None:
+            """Store the parsed frame of `filepath`, replacing any older version of it.
+
+            Never raises, a frame feather can't store, e.g. with a mixed-type object column, is
+            logged and counted in `errors` and simply stays uncached.
+            """
+            key = self._key(filepath, variant)
+            entry_fp = self._entry_fp(key)
+            try:
+                df.reset_index(drop=True).to_feather(entry_fp)
+                n_bytes = os.path.getsize(entry_fp)
+            except Exception as e:
+                self.logger.warning(f'Not caching {filepath}: {type(e).__name__}: {e}')
+                with self._lock:
+                    self.errors += 1
+                try:
+                    os.remove(entry_fp)
+                except FileNotFoundError:
+                    pass
+                return
+
+            path = os.path.abspath(filepath)
+            with self._lock:
+                stale = self._keys.get((path, variant))
+                if stale is not None and stale != key:
+                    self._remove(stale)
+                if key in self._index:
+                    self._bytes -= self._index[key]['bytes']
+                self._index[key] = {'path': path, 'variant': variant, 'bytes': n_bytes, 'last_used': time.time()}
+                self._index.move_to_end(key)
+                self._keys[(path, variant)] = key
+                self._bytes += n_bytes
+                self._evict()
+
+        def flush(self) -> None:
+            """Write the index to disk."""
+            with self._lock:
+                tmp_fp = f'{self._index_fp}.tmp'
+                with open(tmp_fp, 'w') as f:
+                    json.dump(self._index, f)
+                os.replace(tmp_fp, self._index_fp)
+
+        def stats(self) -> Dict[str, int]:
+            """Hit, miss, eviction and error counters along with the current size of the cache."""
+            with self._lock:
+                return {
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'errors': self.errors,
+                    'entries': len(self._index),
+                    'bytes': self._bytes,
+                }
+
+        def _key(self, filepath: str, variant: str) -> str:
+            stat = os.stat(filepath)
+            raw = f'{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}|{variant}'
+            return hashlib.sha1(raw.encode()).hexdigest()
+
+        def _entry_fp(self, key: str) -> str:
+            return os.path.join(self.cache_dir, f'{key}.ftr')
+
+        def _evict(self) -> None:
+            if self.max_bytes is None:
+                return
+            while self._bytes > self.max_bytes and self._index:
+                self._remove(next(iter(self._index)))
+                self.evictions += 1
+
+        def _remove(self, key: str) -> None:
+            entry = self._index.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry['bytes']
+                if self._keys.get((entry['path'], entry['variant'])) == key:
+                    del self._keys[(entry['path'], entry['variant'])]
+            try:
+                os.remove(self._entry_fp(key))
+            except FileNotFoundError:
+                pass
+
+    @classmethod
     def read_files(
+            cls,
             dir: str,
             file_type: Literal['csv', 'ftr'] = 'csv',
             period_beg: Optional[Union[str, pd.Timestamp]] = None,
             period_end: Optional[Union[str, pd.Timestamp]] = None,
             add_date: bool = False,
-            add_filename: bool = False
-        )-> pd.DataFrame:
+            add_filename: bool = False,
+            max_workers: Optional[int] = None,
+            chunked: bool = False,
+            cache: Optional[FileCache] = None,
+            columns: Optional[List[str]] = None,
+            schema: Optional[Dict[str, str]] = None,
+            downcast: bool = False,
+            categorize: Optional[float] = None,
+            engine: Literal['pandas', 'arrow'] = 'pandas',
+            row_filter=None
+        )-> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """Read in a directory of files as a dataframe.
 
+        Files are filtered on the date in their name before being opened and are read in
+        parallel.
+
         Parameters
         ----------
         dir : str
@@ -436,52 +1417,246 @@ class GeneralUtil:
             extracted date from filename.
         add_filename: bool, optional, default False
             Append a column named `_file_name` with extracted filenames.
+        max_workers : Optional[int], optional, default None
+            Number of threads reading files. Default of None lets ThreadPoolExecutor decide.
+        chunked : bool, optional, default False
+            Return a generator yielding one dataframe per file instead of a single dataframe,
+            so that at most `max_workers` files are held in memory at once.
+        cache : Optional[FileCache], optional, default None
+            Serve unchanged files from this cache and add newly parsed ones to it.
+        columns : Optional[List[str]], optional, default None
+            Only read these columns. Default of None reads all of them.
+        schema : Optional[Dict[str, str]], optional, default None
+            Column to dtype mapping applied the same way to csv and feather files, e.g.
+            {'id': 'int32', 'state': 'category', 'created_at': 'datetime64[ns]'}. Datetime
+            dtypes are parsed as dates.
+        downcast : bool, optional, default False
+            Downcast integer and float columns to the smallest dtype holding their values.
+        categorize : Optional[float], optional, default None
+            Convert string columns whose ratio of unique values to rows is at most this value
+            to categoricals, e.g. 0.5.
+        engine : Literal['pandas', 'arrow'], optional, default 'pandas'
+            'arrow' memory-maps feather files, concatenates them as one Arrow table without
+            copying and only converts the requested columns and rows to pandas. Files written
+            with `to_feather(fp, compression='uncompressed')` are read without any copy, the
+            default lz4 compression still has to be decompressed. Only for file_type 'ftr'.
+        row_filter : Optional[pyarrow.compute.Expression], optional, default None
+            Rows to keep when engine is 'arrow', e.g. `pyarrow.compute.field('score') > 50`.
         """
         if dir[-1] == '/':
             dir = dir[:-1]
+        if file_type not in ('csv', 'ftr'):
+            raise Exception('Unsupported file_type.')
         if period_beg:
             period_beg = pd.Timestamp(period_beg).normalize()
         if period_end:
             period_end = pd.Timestamp(period_end).normalize()
 
-        files = []
         filepaths = glob.glob(f'{dir}/*{file_type}')
         if not filepaths:
             raise Exception('No files found in specified directory.')
 
+        # Drop files outside of the period before reading any of them.
+        selected = []
         for filepath in sorted(filepaths, reverse=True):
-            if file_type == 'csv':
-                file = pd.read_csv(filepath)
-            elif file_type == 'ftr':
-                file = pd.read_feather(filepath)
+            file_date = None
+            if period_beg or period_end or add_date:
+                file_date = cls._filename_date(filepath)
+                if period_beg and file_date < period_beg:
+                    continue
+                if period_end and file_date > period_end:
+                    continue
+            selected.append((filepath, file_date))
+
+        if engine == 'arrow':
+            if file_type != 'ftr':
+                raise Exception('engine="arrow" only supports file_type "ftr".')
+            if chunked or cache is not None:
+                raise Exception('engine="arrow" does not support chunked or cache.')
+            df = cls._read_arrow(selected, add_date, add_filename, columns, row_filter)
+            return cls._apply_schema(df, schema, downcast, categorize)
+        if row_filter is not None:
+            raise Exception('row_filter requires engine="arrow".')
+
+        read_opts = {'columns': columns, 'schema': schema, 'downcast': downcast, 'categorize': categorize}
+        frames = cls._iter_files(selected, file_type, add_date, add_filename, max_workers, cache, read_opts)
+        if chunked:
+            return frames
+        frames = list(frames)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(cls._align_categories(frames), axis=0, ignore_index=True)
+
+    @staticmethod
+    def _filename_date(filepath: str) -> pd.Timestamp:
+        """Extract the 'YYYYmmdd' date from the name of `filepath`."""
+        file_name = filepath.split('/')[-1]
+        file_date = re.search(r'\d{8}', file_name)
+        if file_date is None:
+            raise Exception(f'`{file_name}` does not contain a date in the format of YYYYmmdd.')
+        return pd.Timestamp(file_date.group()).normalize()
+
+    @classmethod
+    def _iter_files(
+            cls,
+            selected: List[Tuple[str, Optional[pd.Timestamp]]],
+            file_type: str,
+            add_date: bool,
+            add_filename: bool,
+            max_workers: Optional[int],
+            cache: Optional[FileCache] = None,
+            read_opts: Optional[Dict] = None
+        ) -> Iterator[pd.DataFrame]:
+        """Read `selected` files on a thread pool, yielding frames in order.
+
+        Only a window of `max_workers` files is submitted ahead of the consumer.
+        """
+        n_ahead = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            window = deque()
+            for filepath, file_date in selected:
+                window.append(executor.submit(
+                    cls._read_file, filepath, file_type, file_date, add_date, add_filename, cache, read_opts
+                ))
+                if len(window) >= n_ahead:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+        if cache is not None:
+            cache.flush()
+
+    @classmethod
+    def _read_file(
+            cls,
+            filepath: str,
+            file_type: str,
+            file_date: Optional[pd.Timestamp],
+            add_date: bool,
+            add_filename: bool,
+            cache: Optional[FileCache] = None,
+            read_opts: Optional[Dict] = None
+        ) -> pd.DataFrame:
+        """Read one file of `read_files` and append the requested filename columns."""
+        read_opts = read_opts or {}
+        # Files parsed with other options are cached separately.
+        variant = json.dumps(read_opts, sort_keys=True) if any(read_opts.values()) else ''
+        file = cache.get(filepath, variant) if cache is not None else None
+        if file is None:
+            file = cls._parse_file(filepath, file_type, **read_opts)
+            if cache is not None:
+                cache.put(filepath, file, variant)
+
+        if add_filename:
+            filename_col = '_file_name'
+            if filename_col in file.columns:
+                raise Exception(f'`{filename_col}` column already exists.')
+            file[filename_col] = filepath.split('/')[-1]
+
+        if add_date:
+            filedate_col = '_file_created_at'
+            if filedate_col in file.columns:
+                raise Exception(f'`{filedate_col}` column already exists.')
+            file[filedate_col] = file_date
+        return file
+
+    @classmethod
+    def _parse_file(
+            cls,
+            filepath: str,
+            file_type: str,
+            columns: Optional[List[str]] = None,
+            schema: Optional[Dict[str, str]] = None,
+            downcast: bool = False,
+            categorize: Optional[float] = None
+        ) -> pd.DataFrame:
+        """Parse one csv or feather file applying the column subset, schema and shrinking."""
+        schema = {col: dtype for col, dtype in (schema or {}).items() if columns is None or col in columns}
+        if file_type == 'csv':
+            dates = [col for col, dtype in schema.items() if str(dtype).startswith('datetime')]
+            dtypes = {col: dtype for col, dtype in schema.items() if col not in dates}
+            file = pd.read_csv(filepath, usecols=columns, dtype=dtypes or None, parse_dates=dates or None)
+        else:
+            file = pd.read_feather(filepath, columns=columns)
+        return cls._apply_schema(file, schema, downcast, categorize)
+
+    @staticmethod
+    def _apply_schema(
+            file: pd.DataFrame,
+            schema: Optional[Dict[str, str]] = None,
+            downcast: bool = False,
+            categorize: Optional[float] = None
+        ) -> pd.DataFrame:
+        """Cast `file` to `schema`, then downcast or categorize the columns it does not cover."""
+        schema = {col: dtype for col, dtype in (schema or {}).items() if col in file.columns}
+        for col, dtype in schema.items():
+            if file[col].dtype == dtype:
+                continue
+            if str(dtype).startswith('datetime'):
+                file[col] = pd.to_datetime(file[col])
             else:
-                raise Exception('Unsupported file_type.')
+                file[col] = file[col].astype(dtype)
 
-            file_name = filepath.split('/')[-1]
-            if period_beg or period_end or add_date:
-                file_date = re.search('\d{8}', file_name).group()
-                file_date = pd.Timestamp(file_date).normalize()
+        for col in file.columns:
+            if col in schema:
+                continue
+            series = file[col]
+            if downcast and pd.api.types.is_integer_dtype(series):
+                file[col] = pd.to_numeric(series, downcast='integer')
+            elif downcast and pd.api.types.is_float_dtype(series):
+                file[col] = pd.to_numeric(series, downcast='float')
+            elif categorize is not None and pd.api.types.is_string_dtype(series.dtype) and len(series):
+                if series.nunique() / len(series) <= categorize:
+                    file[col] = series.astype('category')
+        return file
 
-            if add_filename:
-                filename_col = '_file_name'
-                if filename_col in file.columns:
-                    raise Exception(f'`{filename_col}` column already exists.')
-                file[filename_col] = file_name
+    @staticmethod
+    def _read_arrow(
+            selected: List[Tuple[str, Optional[pd.Timestamp]]],
+            add_date: bool,
+            add_filename: bool,
+            columns: Optional[List[str]] = None,
+            row_filter=None
+        ) -> pd.DataFrame:
+        """Memory-map feather files into one Arrow table and convert only what is requested."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        from pyarrow import fs
 
+        filesystem = fs.LocalFileSystem(use_mmap=True)
+        tables = []
+        for filepath, file_date in selected:
+            table = ds.dataset(filepath, format='ipc', filesystem=filesystem).to_table(
+                columns=columns, filter=row_filter
+            )
+            if add_filename:
+                if '_file_name' in table.column_names:
+                    raise Exception('`_file_name` column already exists.')
+                file_name = pa.scalar(filepath.split('/')[-1])
+                table = table.append_column('_file_name', pa.repeat(file_name, table.num_rows))
             if add_date:
-                filedate_col = '_file_created_at'
-                if filedate_col in file.columns:
-                    raise Exception(f'`{filedate_col}` column already exists.')
-                file[filedate_col] = file_date
-            
-            files.append(file)
-        files = pd.concat(files, axis=0, ignore_index=True)
+                if '_file_created_at' in table.column_names:
+                    raise Exception('`_file_created_at` column already exists.')
+                file_date = pa.scalar(file_date.to_pydatetime(), type=pa.timestamp('ns'))
+                table = table.append_column('_file_created_at', pa.repeat(file_date, table.num_rows))
+            tables.append(table)
+        if not tables:
+            return pd.DataFrame()
+        # Chunks are stitched together without copying, pandas conversion is the only copy.
+        return pa.concat_tables(tables).to_pandas()
 
-        if period_beg:
-            files = files[files['_file_created_at'] >= period_beg].reset_index(drop=True)
-        if period_end:
-            files = files[files['_file_created_at'] <= period_end].reset_index(drop=True)
-        return files
+    @staticmethod
+    def _align_categories(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Give categorical columns the same categories in every frame.
+
+        Otherwise pd.concat falls back to object dtype for categoricals that differ per file.
+        """
+        cat_cols = set.intersection(*[set(frame.select_dtypes('category').columns) for frame in frames])
+        for col in cat_cols:
+            union = pd.api.types.union_categoricals([frame[col] for frame in frames], ignore_order=True)
+            categories = union.categories
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+        return frames
 
     @staticmethod
     def snake_to_pascal(snake: str) -> str:
@@ -0,0 +1,169 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+JOURNAL_FP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.submissions.jsonl')
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+class SubmissionJournal:
+    """Append-only JSON lines journal of submission outcomes, so reruns only do what is left.
+
+    Every outcome is one line, flushed and fsynced before `record` returns, so a crash loses at
+    most the submission in flight. On open the journal is replayed into an index of the latest
+    outcome per (form, batch, item), which `pending` and `status` look up in constant time. A
+    torn last line from a crash is skipped. When superseded lines outnumber live ones the file
+    is rewritten with only the latest outcome of the most recent batches.
+
+    A batch is the period one submission counts for, by default the current day, so the first
+    successful run of a day covers every later run of that day.
+
+    Example use:
+
+    with SubmissionJournal() as journal:
+        for id in journal.pending(FORM_URL, ids):
+            fill_form(driver, id, 'Makai')
+            journal.record(FORM_URL, id, ok=True)
+    """
+    def __init__(
+            self,
+            fp: str = JOURNAL_FP,
+            batch: Optional[str] = None,
+            keep_batches: int = 7,
+            logger: Optional[logging.Logger] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        fp : str, optional, default JOURNAL_FP
+            Journal file, created if missing.
+        batch : Optional[str], optional, default None
+            Label of the current batch. Defaults to today's date, e.g. '2024-01-31'.
+        keep_batches : int, optional, default 7
+            Most recent batches kept when the journal is compacted.
+        """
+        self.fp = fp
+        self.batch = batch or time.strftime('%Y-%m-%d')
+        self.keep_batches = keep_batches
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        self._n_lines = 0
+        torn = self._replay()
+        self._f = open(self.fp, 'a')
+        if torn:
+            # Start a new line so the next entry isn't glued to the torn one.
+            self._f.write('\n')
+
+    def __enter__(self) -> 'SubmissionJournal':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def pending(self, form: str, items: Iterable[str]) -> List[str]:
+        """Return the `items` without a successful outcome in the current batch, in order."""
+        with self._lock:
+            done = self._index.get((form, self.batch), {})
+            return [item for item in items if not done.get(str(item), {}).get('ok')]
+
+    def status(self, form: str, item: str) -> Optional[Dict]:
+        """Return the latest outcome of `item` in the current batch, or None."""
+        with self._lock:
+            return self._index.get((form, self.batch), {}).get(str(item))
+
+    def record(
+            self,
+            form: str,
+            item: str,
+            ok: bool,
+            error: Optional[str] = None,
+            duration: Optional[float] = None
+        ) -> None:
+        """Durably append the outcome of one submission."""
+        with self._lock:
+            previous = self._index.get((form, self.batch), {}).get(str(item))
+            entry = {
+                'form': form,
+                'batch': self.batch,
+                'item': str(item),
+                'ok': ok,
+                'attempts': (previous['attempts'] if previous else 0) + 1,
+                'error': error,
+                'duration': duration,
+                'time': time.time(),
+            }
+            self._f.write(json.dumps(entry) + '\n')
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._index.setdefault((form, self.batch), {})[entry['item']] = entry
+            self._n_lines += 1
+
+    def summary(self, form: str) -> Dict[str, int]:
+        """Count succeeded and failed items of `form` in the current batch."""
+        with self._lock:
+            entries = self._index.get((form, self.batch), {}).values()
+            n_ok = sum(entry['ok'] for entry in entries)
+            return {'ok': n_ok, 'failed': len(entries) - n_ok}
+
+    def compact(self) -> int:
+        """Rewrite the journal with the latest outcome per item of the most recent batches.
+
+        Returns
+        -------
+        int
+            Number of lines dropped.
+        """
+        with self._lock:
+            batches = sorted({batch for _, batch in self._index})[-self.keep_batches:]
+            self._index = {key: entries for key, entries in self._index.items() if key[1] in batches}
+            entries = [entry for entries in self._index.values() for entry in entries.values()]
+
+            tmp_fp = f'{self.fp}.tmp'
+            with open(tmp_fp, 'w') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._f.close()
+            os.replace(tmp_fp, self.fp)
+            self._f = open(self.fp, 'a')
+
+            n_dropped, self._n_lines = self._n_lines - len(entries), len(entries)
+            return n_dropped
+
+    def close(self) -> None:
+        """Close the journal, compacting it first if it is mostly superseded lines."""
+        if self._f.closed:
+            return
+        n_live = sum(len(entries) for entries in self._index.values())
+        if self._n_lines > 2 * n_live:
+            self.logger.info(f'Compacted submission journal, dropped {self.compact()} lines.')
+        self._f.close()
+
+    def _replay(self) -> bool:
+        """Rebuild the index from the journal. Returns whether the last line is incomplete."""
+        if not os.path.exists(self.fp):
+            return False
+        line = ''
+        with open(self.fp) as f:
+            for line_no, line in enumerate(f, 1):
+                # Unreadable lines count too, so compaction eventually drops them.
+                self._n_lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f'Skipping unreadable line {line_no} of {self.fp}.')
+                    continue
+                self._index.setdefault((entry['form'], entry['batch']), {})[entry['item']] = entry
+        return bool(line) and not line.endswith('\n')
@@ -0,0 +1,212 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from waits import Locator, PageWaiter
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+LOCATOR_CACHE_FP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.locator_cache.json')
+# Bumped when remembered winners can no longer be trusted, e.g. a candidate changed meaning.
+_CACHE_VERSION = 2
+
+# Strategies with a CSS equivalent are rewritten to CSS, everything else must be XPath.
+_CSS_TEMPLATES = {
+    By.ID: '[id="{}"]',
+    By.NAME: '[name="{}"]',
+    By.CLASS_NAME: '.{}',
+    By.TAG_NAME: '{}',
+}
+
+# Finds every element in one round trip. For each element the candidates are tried in order
+# and the first one matching anything wins. Clickable elements must be rendered and enabled.
+_RESOLVE_SCRIPT = """
+var specs = arguments[0], out = {};
+function usable(el) {
+    return !el.disabled && el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+}
+for (var i = 0; i < specs.length; i++) {
+    var spec = specs[i], found = null;
+    for (var j = 0; j < spec.candidates.length && !found; j++) {
+        var how = spec.candidates[j][0], what = spec.candidates[j][1], nodes = [];
+        try {
+            if (how === 'xpath') {
+                var snap = document.evaluate(what, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (var k = 0; k < snap.snapshotLength; k++) nodes.push(snap.snapshotItem(k));
+            } else {
+                nodes = Array.prototype.slice.call(document.querySelectorAll(what));
+            }
+        } catch (e) {
+            continue;  // Invalid selector, try the next one.
+        }
+        if (spec.clickable) nodes = nodes.filter(usable);
+        if (nodes.length) found = {index: j, elements: spec.multiple ? nodes : [nodes[0]]};
+    }
+    out[spec.name] = found;
+}
+return out;
+"""
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass(frozen=True)
+class FormElement:
+    """An element of the form and the locators that may find it, most trusted first."""
+    name: str
+    candidates: Tuple[Locator, ...]
+    clickable: bool = False
+    multiple: bool = False
+
+
+class LocatorRegistry:
+    """Resolve all elements of a form in one script call, learning which locator works.
+
+    Candidates are tried in the order given, so list the CSS selectors first and the looser
+    fallbacks last. The locator that found an element is remembered per form and tried first
+    from then on, and kept in `cache_fp` across runs.
+    When it stops matching the remaining candidates are still tried in the same call, so a
+    layout change costs nothing but a log line.
+
+    Example use:
+
+    registry = LocatorRegistry([
+        FormElement('textbox', ((By.CSS_SELECTOR, 'form input[type="text"]'), (By.XPATH, '//input'))),
+        FormElement('submit', ((By.XPATH, "//span[contains(text(),'Submit')]"),), clickable=True),
+    ])
+    elements = registry.resolve(PageWaiter(driver), FORM_URL)
+    elements['textbox'].send_keys(student_id)
+    """
+    def __init__(
+            self,
+            elements: Sequence[FormElement],
+            cache_fp: Optional[str] = LOCATOR_CACHE_FP,
+            logger: Optional[logging.Logger] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        elements : Sequence[FormElement]
+            Every element `resolve` looks up.
+        cache_fp : Optional[str], optional, default LOCATOR_CACHE_FP
+            JSON file where the winning locators are kept, keyed by form. None disables it.
+        """
+        self.elements = list(elements)
+        self.cache_fp = cache_fp
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._winners: Dict[str, Dict[str, Locator]] = self._load()
+
+    def resolve(
+            self,
+            waiter: PageWaiter,
+            form: str,
+            timeout: Optional[float] = None
+        ) -> Dict[str, Union[WebElement, List[WebElement]]]:
+        """Wait until every element is found and return them by name.
+
+        Each poll of the wait is a single `execute_script` call for all elements.
+
+        Parameters
+        ----------
+        form : str
+            Form URL, the key winning locators are remembered under.
+        """
+        return waiter.until(lambda driver: self.find(driver, form), 'form elements', 'found', timeout)
+
+    def find(self, driver: webdriver.Chrome, form: str) -> Optional[Dict[str, Union[WebElement, List[WebElement]]]]:
+        """Look up every element once. Returns None if any of them is missing."""
+        form = self._form_key(form)
+        ordered = {element.name: self._ordered(form, element) for element in self.elements}
+        specs = [
+            {
+                'name': element.name,
+                'candidates': [list(locator) for locator in ordered[element.name]],
+                'clickable': element.clickable,
+                'multiple': element.multiple,
+            }
+            for element in self.elements
+        ]
+        found = driver.execute_script(_RESOLVE_SCRIPT, specs)
+        if any(found.get(element.name) is None for element in self.elements):
+            return None
+
+        resolved = {}
+        winners = {}
+        for element in self.elements:
+            match = found[element.name]
+            winners[element.name] = ordered[element.name][match['index']]
+            resolved[element.name] = match['elements'] if element.multiple else match['elements'][0]
+        self._remember(form, winners)
+        return resolved
+
+    def winners(self, form: str) -> Dict[str, Locator]:
+        """Locators that last found each element of `form`."""
+        with self._lock:
+            return dict(self._winners.get(self._form_key(form), {}))
+
+    def _ordered(self, form: str, element: FormElement) -> List[Locator]:
+        candidates = [self._normalize(locator) for locator in element.candidates]
+        with self._lock:
+            winner = self._winners.get(form, {}).get(element.name)
+        if winner in candidates:
+            candidates.remove(winner)
+            candidates.insert(0, winner)
+        return candidates
+
+    def _remember(self, form: str, winners: Dict[str, Locator]) -> None:
+        with self._lock:
+            previous = self._winners.get(form, {})
+            if previous == winners:
+                return
+            for name, locator in winners.items():
+                if name in previous and previous[name] != locator:
+                    self.logger.warning(f'Locator for {name} changed from {previous[name]} to {locator}.')
+            self._winners[form] = winners
+            self._save()
+
+    def _load(self) -> Dict[str, Dict[str, Locator]]:
+        if not self.cache_fp or not os.path.exists(self.cache_fp):
+            return {}
+        with open(self.cache_fp) as f:
+            cache = json.load(f)
+        if cache.get('version') != _CACHE_VERSION:
+            self.logger.info(f'Ignoring locator cache {self.cache_fp} of an older version.')
+            return {}
+        return {
+            form: {name: tuple(locator) for name, locator in winners.items()}
+            for form, winners in cache['forms'].items()
+        }
+
+    def _save(self) -> None:
+        if not self.cache_fp:
+            return
+        with open(self.cache_fp, 'w') as f:
+            json.dump({'version': _CACHE_VERSION, 'forms': self._winners}, f, indent=2)
+
+    @staticmethod
+    def _normalize(locator: Locator) -> Locator:
+        how, what = locator
+        if how in _CSS_TEMPLATES:
+            return (By.CSS_SELECTOR, _CSS_TEMPLATES[how].format(what))
+        if how not in (By.CSS_SELECTOR, By.XPATH):
+            raise ValueError(f'Unsupported locator strategy {how!r}.')
+        return (how, what)
+
+    @staticmethod
+    def _form_key(url: str) -> str:
+        """Drop the query and fragment, e.g. `?usp=sf_link`, so they don't split the cache."""
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
@@ -0,0 +1,200 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from selenium import webdriver
+
+from browser import DriverPool, launch_chrome
+from timing import SpanRecorder
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass
+class SubmissionResult:
+    """Outcome of one form submission."""
+    item: str
+    ok: bool
+    worker: int  # -1 if the pool failed before any worker took the item.
+    duration: float
+    error: Optional[str] = None
+
+
+class FormScheduler:
+    """Fan form submissions out over a fixed number of browser workers.
+
+    Every worker is a thread that keeps the same Chrome driver for all the items it processes,
+    so the browser is launched once per worker rather than once per item. Failures are recorded
+    per item and never stop the other workers. A worker whose browser can't be relaunched stops
+    and leaves the queue to the others, and items no worker got to are reported as not run.
+
+    Example use:
+
+    scheduler = FormScheduler(lambda driver, id: fill_form(driver, id, 'Makai'), max_workers=4)
+    results = scheduler.run(ids)
+    print(FormScheduler.summarize(results))
+    """
+    def __init__(
+            self,
+            submit: Callable[[webdriver.Chrome, str], None],
+            max_workers: int = 1,
+            launcher: Callable[[], webdriver.Chrome] = launch_chrome,
+            logger: Optional[logging.Logger] = None,
+            spans: Optional[SpanRecorder] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        submit : Callable[[webdriver.Chrome, str], None]
+            Fills and submits the form for one item with the given driver. Raising marks the
+            item as failed.
+        max_workers : int, optional, default 1
+            Concurrency cap, i.e. the most browsers running at once.
+        launcher : Callable[[], webdriver.Chrome], optional, default launch_chrome
+            Zero-argument callable returning a new driver.
+        logger : Optional[logging.Logger], optional, default None
+            Logger used for per-item events. Defaults to the module logger.
+        spans : Optional[SpanRecorder], optional, default None
+            Passed on to the DriverPool to time driver launch and quit.
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1.')
+        self.submit = submit
+        self.max_workers = max_workers
+        self.launcher = launcher
+        self.logger = logger or logging.getLogger(__name__)
+        self.spans = spans
+
+    def run(self, items: Iterable[str], pool: Optional[DriverPool] = None) -> List[SubmissionResult]:
+        """Submit every item and return the results in input order.
+
+        Parameters
+        ----------
+        pool : Optional[DriverPool], optional, default None
+            Started pool to borrow drivers from, left open afterwards. Default of None launches
+            a pool for this run only.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        pending = queue.Queue()
+        for idx, item in enumerate(items):
+            pending.put((idx, item))
+        results: List[Optional[SubmissionResult]] = [None] * len(items)
+        lock = threading.Lock()
+        lost: List[Tuple[int, str]] = []
+
+        # No point launching more browsers than there are items.
+        n_workers = min(self.max_workers, len(items))
+        try:
+            if pool is not None:
+                self._run_workers(min(n_workers, pool.size), pool, pending, results, lock, lost)
+            else:
+                with DriverPool(size=n_workers, launcher=self.launcher, logger=self.logger, spans=self.spans) as pool:
+                    self._run_workers(n_workers, pool, pending, results, lock, lost)
+        except Exception as e:
+            # E.g. no browser of the pool started. Keep the results collected so far.
+            error = f'{type(e).__name__}: {e}'
+            self.logger.error(f'Stopped submitting: {error}')
+            lost.append((-1, error))
+
+        for idx, item in enumerate(items):
+            if results[idx] is None:
+                worker, error = lost[-1]
+                results[idx] = SubmissionResult(item, False, worker, 0.0, f'Not run, no browser left: {error}')
+        return results
+
+    def _run_workers(
+            self,
+            n_workers: int,
+            pool: DriverPool,
+            pending: queue.Queue,
+            results: List[Optional[SubmissionResult]],
+            lock: threading.Lock,
+            lost: List[Tuple[int, str]]
+        ) -> None:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                executor.submit(self._work, worker, pool, pending, results, lock, lost)
+                for worker in range(n_workers)
+            ]
+            for future in futures:
+                future.result()
+
+    def _work(
+            self,
+            worker: int,
+            pool: DriverPool,
+            pending: queue.Queue,
+            results: List[Optional[SubmissionResult]],
+            lock: threading.Lock,
+            lost: List[Tuple[int, str]]
+        ) -> None:
+        """Process items off `pending` with a single driver until the queue is drained.
+
+        Returns early, recording why in `lost`, when no driver can be had.
+        """
+        try:
+            driver = pool.acquire()
+        except Exception as e:
+            self._lose(worker, e, lost, lock)
+            return
+        try:
+            while True:
+                try:
+                    idx, item = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                start = time.perf_counter()
+                error = None
+                try:
+                    self.submit(driver, item)
+                except Exception as e:
+                    error = f'{type(e).__name__}: {e}'
+                    self.logger.error(f'Worker {worker} failed on {item}: {error}')
+                result = SubmissionResult(item, error is None, worker, time.perf_counter() - start, error)
+                with lock:
+                    results[idx] = result
+
+                # Keep the same driver unless it can no longer be reset, then swap in a fresh one.
+                try:
+                    pool.reset(driver)
+                except Exception:
+                    failed_driver, driver = driver, None
+                    try:
+                        pool.release(failed_driver, broken=True)
+                        driver = pool.acquire()
+                    except Exception as e:
+                        self._lose(worker, e, lost, lock)
+                        return
+        finally:
+            if driver is not None:
+                try:
+                    pool.release(driver)
+                except Exception as e:
+                    self.logger.warning(f'Worker {worker} failed to return its driver: {e}')
+
+    def _lose(self, worker: int, e: Exception, lost: List[Tuple[int, str]], lock: threading.Lock) -> None:
+        error = f'{type(e).__name__}: {e}'
+        self.logger.error(f'Worker {worker} has no driver left and stops: {error}')
+        with lock:
+            lost.append((worker, error))
+
+    @staticmethod
+    def summarize(results: List[SubmissionResult]) -> str:
+        """Format a per-item summary of `results`."""
+        n_ok = sum(result.ok for result in results)
+        lines = [f'{n_ok}/{len(results)} submissions succeeded.']
+        for result in results:
+            status = 'OK' if result.ok else f'FAILED ({result.error})'
+            lines.append(f'  {result.item}: {status} [worker {result.worker}, {result.duration:.2f}s]')
+        return '\n'.join(lines)
@@ -0,0 +1,101 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from fake_form_server import FORM_HTML
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+class FakeChrome:
+    """Stand-in for the webdriver.Chrome calls DriverPool makes.
+
+    Records what was done to it. Once `crash` is called every call fails like a dead
+    chromedriver does, with a connection error.
+    """
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.quit_calls = 0
+        self.handles = ['main']
+        self.url = 'about:blank'
+        self.cookies = {'session': '1'}
+        self.calls = []
+        self.switch_to = SimpleNamespace(window=lambda handle: self._call('switch_to', handle))
+
+    def __repr__(self):
+        return f'FakeChrome({self.number})'
+
+    def crash(self):
+        self.alive = False
+
+    @property
+    def window_handles(self):
+        self._call('window_handles')
+        return list(self.handles)
+
+    def close(self):
+        self._call('close')
+        self.handles.pop()
+
+    def execute_script(self, script):
+        self._call('execute_script', script)
+
+    def execute_cdp_cmd(self, cmd, args):
+        self._call('execute_cdp_cmd', cmd)
+
+    def delete_all_cookies(self):
+        self._call('delete_all_cookies')
+        self.cookies.clear()
+
+    def get(self, url):
+        self._call('get', url)
+        self.url = url
+
+    def quit(self):
+        self.quit_calls += 1
+        self.alive = False
+
+    def _call(self, name, *args):
+        if not self.alive:
+            raise ConnectionRefusedError('chromedriver is gone')
+        self.calls.append((name, *args))
+
+
+class FakeLauncher:
+    """Zero-argument launcher handing out numbered FakeChrome drivers.
+
+    Raises instead of launching while `fail` is set, like a Chrome that won't start.
+    """
+    def __init__(self):
+        self.drivers = []
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self.fail:
+                raise RuntimeError('Chrome failed to start')
+            driver = FakeChrome(len(self.drivers))
+            self.drivers.append(driver)
+            return driver
+
+
+# --------------------------------------------------------------------------------------------------
+# Fixtures
+# --------------------------------------------------------------------------------------------------
+@pytest.fixture
+def launcher():
+    return FakeLauncher()
+
+
+@pytest.fixture
+def form_url(tmp_path):
+    """The fake form as a static HTML file, as a file:// URL."""
+    fp = tmp_path / 'form.html'
+    fp.write_text(FORM_HTML)
+    return fp.as_uri()
@@ -0,0 +1,151 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_runner import AsyncBatchRunner, TokenBucket
+from direct_submit import DirectSubmitter
+from fake_form_server import FakeFormServer
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+def test_token_bucket_paces_after_burst():
+    async def take(n):
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Two tokens are there from the start, the next four take 1/20 s each.
+    assert 0.18 <= asyncio.run(take(6)) < 0.5
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_rate_limit_against_fake_endpoint():
+    with FakeFormServer() as server, DirectSubmitter(server.url, ['{student_id}', 0, 0], cache_fp=None) as submitter:
+        runner = AsyncBatchRunner(lambda url, item: submitter.submit(item), rate=10, burst=1, max_concurrency=1)
+        results = runner.run([(server.url, [str(id) for id in range(5)])])
+
+    assert all(result.ok for result in results)
+    assert len(server.submitted_at) == 5
+    # Single gaps jitter with request latency, the span of four token waits does not.
+    assert server.submitted_at[-1] - server.submitted_at[0] > 0.35
+
+
+def test_rate_limit_holds_when_concurrency_slots_free_up_together():
+    starts = []
+    lock = threading.Lock()
+
+    def submit(url, item):
+        with lock:
+            starts.append(time.monotonic())
+        # The first four calls all end at about t=0.6 while the others queue behind them.
+        time.sleep(max(0.0, 0.6 - 0.1 * int(item)))
+
+    runner = AsyncBatchRunner(submit, rate=10, burst=1, max_concurrency=4)
+    results = runner.run([('http://forms.test/a', [str(id) for id in range(8)])])
+
+    assert all(result.ok for result in results)
+    # Tasks waiting for a slot must not have taken a token yet, or they start all at once.
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) > 0.07
+
+
+def test_transient_errors_are_retried_up_to_the_limit():
+    calls = []
+
+    def submit(url, item):
+        calls.append(item)
+        raise OSError('connection reset')
+
+    runner = AsyncBatchRunner(submit, rate=100, retries=2, backoff=0)
+    [result] = runner.run([('http://forms.test/a', ['210072'])])
+
+    assert not result.ok
+    assert result.attempts == 3
+    assert calls == ['210072'] * 3
+    assert result.error == 'OSError: connection reset'
+
+
+def test_other_errors_fail_at_once():
+    def submit(url, item):
+        raise ValueError('bad answer')
+
+    runner = AsyncBatchRunner(submit, rate=100, retries=2, backoff=0)
+    [result] = runner.run([('http://forms.test/a', ['210072'])])
+
+    assert not result.ok
+    assert result.attempts == 1
+
+
+def test_recovers_after_transient_failure():
+    failures = {'210072': 1}
+
+    def submit(url, item):
+        if failures.get(item):
+            failures[item] -= 1
+            raise OSError('flaky')
+
+    runner = AsyncBatchRunner(submit, rate=100, retries=2, backoff=0)
+    results = runner.run([('http://forms.test/a', ['210072', '210071'])])
+
+    assert [(result.item, result.ok, result.attempts) for result in results] == [
+        ('210072', True, 2),
+        ('210071', True, 1),
+    ]
+
+
+def test_slow_thread_attempt_is_not_retried_while_running():
+    calls = []
+
+    def submit(url, item):
+        calls.append(item)
+        time.sleep(0.3)
+
+    runner = AsyncBatchRunner(submit, rate=100, retries=2, attempt_timeout=0.1)
+    [result] = runner.run([('http://forms.test/a', ['210072'])])
+
+    assert result.ok
+    assert calls == ['210072']
+
+
+def test_batch_timeout_cancels_waiting_tasks_and_waits_for_threads():
+    running = []
+
+    def submit(url, item):
+        running.append(threading.current_thread())
+        time.sleep(0.3)
+
+    runner = AsyncBatchRunner(submit, rate=100, max_concurrency=1)
+    results = runner.run([('http://forms.test/a', ['210072', '210071'])], timeout=0.1)
+
+    # The first submission was already running and went through, the second never started.
+    assert [result.ok for result in results] == [True, False]
+    assert results[1].error == 'Cancelled after 0.1 seconds.'
+    assert len(running) == 1
+    assert not running[0].is_alive()
+
+
+def test_coroutine_attempts_time_out_and_retry():
+    calls = []
+
+    async def submit(url, item):
+        calls.append(item)
+        await asyncio.sleep(1)
+
+    runner = AsyncBatchRunner(submit, rate=100, retries=1, backoff=0, attempt_timeout=0.05)
+    [result] = runner.run([('http://forms.test/a', ['210072'])])
+
+    assert not result.ok
+    assert result.attempts == 2
+    assert len(calls) == 2
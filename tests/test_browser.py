@@ -0,0 +1,139 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import shutil
+from functools import partial
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from browser import PROFILES, DriverPool, launch_chrome
+from waits import PageWaiter
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+def test_drivers_are_launched_once_and_reused(launcher):
+    with DriverPool(size=2, launcher=launcher) as pool:
+        assert len(launcher.drivers) == 2
+        for _ in range(5):
+            with pool.driver() as driver:
+                assert driver in launcher.drivers
+
+    assert len(launcher.drivers) == 2
+    assert all(driver.quit_calls == 1 for driver in launcher.drivers)
+
+
+def test_release_resets_the_driver(launcher):
+    with DriverPool(launcher=launcher) as pool:
+        driver = pool.acquire()
+        driver.handles.append('popup')
+        driver.get('file:///tmp/form.html')
+        pool.release(driver)
+
+        assert driver.handles == ['main']
+        assert driver.cookies == {}
+        assert driver.url == 'about:blank'
+        assert ('execute_cdp_cmd', 'Network.clearBrowserCache') in driver.calls
+        assert pool.acquire() is driver
+
+
+def test_acquire_replaces_a_crashed_driver(launcher):
+    with DriverPool(launcher=launcher) as pool:
+        crashed = pool.acquire()
+        pool.release(crashed)
+        crashed.crash()
+
+        driver = pool.acquire()
+
+        assert driver is not crashed
+        assert launcher.drivers == [crashed, driver]
+
+
+def test_release_replaces_broken_and_unresettable_drivers(launcher):
+    with DriverPool(launcher=launcher) as pool:
+        broken = pool.acquire()
+        pool.release(broken, broken=True)
+        assert broken.quit_calls == 1
+
+        unresettable = pool.acquire()
+        assert unresettable is not broken
+        unresettable.crash()
+        pool.release(unresettable)
+
+        assert pool.acquire() is launcher.drivers[2]
+
+
+def test_driver_context_replaces_the_driver_on_webdriver_errors(launcher):
+    with DriverPool(launcher=launcher) as pool:
+        with pytest.raises(WebDriverException):
+            with pool.driver() as first:
+                raise WebDriverException('tab crashed')
+        with pool.driver() as second:
+            assert second is not first
+
+
+def test_failed_relaunch_keeps_the_slot(launcher):
+    with DriverPool(launcher=launcher) as pool:
+        dead = pool.acquire()
+        pool.release(dead)
+        dead.crash()
+
+        launcher.fail = True
+        with pytest.raises(RuntimeError, match='failed to start'):
+            pool.acquire()
+
+        # The dead driver went back to the pool, so the next acquire tries again instead of
+        # blocking forever on an empty pool.
+        launcher.fail = False
+        driver = pool.acquire(timeout=1)
+        assert driver is launcher.drivers[1]
+
+
+def test_failed_start_quits_the_drivers_that_started(launcher):
+    def flaky_launcher():
+        if launcher.drivers:
+            launcher.fail = True
+        return launcher()
+
+    with pytest.raises(RuntimeError):
+        with DriverPool(size=2, launcher=flaky_launcher):
+            pass
+
+    [started] = launcher.drivers
+    assert started.quit_calls == 1
+
+
+def test_closed_pool_refuses_drivers(launcher):
+    pool = DriverPool(launcher=launcher)
+    with pool:
+        driver = pool.acquire()
+    with pytest.raises(RuntimeError, match='closed'):
+        pool.acquire()
+
+    # Close quit the borrowed driver too, and returning it quits it instead of pooling it.
+    pool.release(driver)
+    assert driver.quit_calls == 2
+    assert pool._idle.empty()
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        DriverPool(size=0)
+
+
+@pytest.mark.skipif(
+    not any(shutil.which(name) for name in ('google-chrome', 'chromium', 'chromium-browser')),
+    reason='Chrome is not installed.',
+)
+def test_real_chrome_against_static_form(form_url):
+    with DriverPool(launcher=partial(launch_chrome, PROFILES['lean'])) as pool:
+        for student_id in ('210072', '210071'):
+            with pool.driver() as driver:
+                driver.get(form_url)
+                form = PageWaiter(driver, timeout=10).form_ready()
+                textbox = form.find_element('css selector', 'input[type="text"]')
+                # A reset driver starts from a fresh copy of the form.
+                assert textbox.get_attribute('value') == ''
+                textbox.send_keys(student_id)
+                form.find_element('css selector', 'fieldset:nth-of-type(1) input[type="radio"]').click()
@@ -0,0 +1,68 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import json
+
+import pytest
+
+from direct_submit import DirectSubmitter, FormField, FormLayoutChanged, FormSchema
+from fake_form_server import FakeFormServer
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+ANSWERS = ['{student_id}', 0, 0]
+
+
+@pytest.fixture
+def server():
+    with FakeFormServer() as server:
+        yield server
+
+
+def test_submits_learned_schema(server):
+    with DirectSubmitter(server.url, answers=ANSWERS, cache_fp=None) as submitter:
+        submitter.submit('210072')
+        submitter.submit('210071')
+
+    assert server.submissions == [
+        {'fvv': '1', 'entry.1001': '210072', 'entry.1002': 'In person', 'entry.1003': '1 hour'},
+        {'fvv': '1', 'entry.1001': '210071', 'entry.1002': 'In person', 'entry.1003': '1 hour'},
+    ]
+
+
+def test_schema_is_cached(server, tmp_path):
+    cache_fp = str(tmp_path / 'schema.json')
+    with DirectSubmitter(server.url, answers=ANSWERS, cache_fp=cache_fp) as submitter:
+        submitter.submit('210072')
+
+    with open(cache_fp) as f:
+        cached = FormSchema.from_dict(json.load(f)[server.url])
+    assert [field.name for field in cached.fields] == ['entry.1001', 'entry.1002', 'entry.1003']
+    assert cached.action == server.url.replace('/viewform', '/formResponse')
+
+
+def test_relearns_stale_cached_schema(server, tmp_path):
+    cache_fp = str(tmp_path / 'schema.json')
+    stale = FormSchema(
+        server.url,
+        server.url.replace('/viewform', '/formResponse'),
+        [FormField('entry.1'), FormField('entry.2', options=['x']), FormField('entry.3', options=['y'])],
+    )
+    DirectSubmitter(server.url, answers=ANSWERS, cache_fp=cache_fp).learn(stale)
+
+    with DirectSubmitter(server.url, answers=ANSWERS, cache_fp=cache_fp) as submitter:
+        submitter.submit('210072')
+        submitter.submit('210071')
+
+    assert [submission['entry.1001'] for submission in server.submissions] == ['210072', '210071']
+    with open(cache_fp) as f:
+        assert json.load(f)[server.url]['fields'][0]['name'] == 'entry.1001'
+
+
+def test_fresh_schema_mismatch_raises(server):
+    # The fake form only has two options per question.
+    with DirectSubmitter(server.url, answers=['{student_id}', 5, 0], cache_fp=None) as submitter:
+        with pytest.raises(FormLayoutChanged):
+            submitter.submit('210072')
+    assert server.submissions == []
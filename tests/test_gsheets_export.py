@@ -0,0 +1,93 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import os
+
+import pandas as pd
+import pytest
+
+from fake_gsheets import FakeGsheetClient
+from general import GeneralUtil
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+@pytest.fixture
+def client():
+    return FakeGsheetClient({
+        'Attendance': {
+            'Monday': [['student_id', 'attendance', 'score'], ['210072', 'In person', '98'], ['210071', 'Online']],
+            "Bob's sheet": [['student_id'], ['210029']],
+        },
+        'Roster': {
+            'Sheet1': [['student_id', 'name'], ['210072', 'Makai']],
+        },
+    })
+
+
+def _exports(tmp_path):
+    return [
+        ('Attendance', 'Monday', str(tmp_path / 'monday.csv')),
+        ('Attendance', "Bob's sheet", str(tmp_path / 'bob.csv')),
+        ('Roster', 'Sheet1', str(tmp_path / 'roster.csv')),
+    ]
+
+
+def test_one_open_and_batch_read_per_spreadsheet(client, tmp_path):
+    status = GeneralUtil.gsheets_to_files(client, _exports(tmp_path))
+
+    assert set(status.values()) == {'exported'}
+    assert client.calls == {'open': 2, 'values_batch_get': 2}
+
+    monday = pd.read_csv(tmp_path / 'monday.csv')
+    assert monday['student_id'].tolist() == [210072, 210071]
+    # Trailing empty cells dropped by the API come back as missing values.
+    assert monday['score'].isna().tolist() == [False, True]
+    assert pd.read_csv(tmp_path / 'bob.csv')['student_id'].tolist() == [210029]
+
+
+def test_unchanged_spreadsheets_are_skipped(client, tmp_path):
+    manifest_fp = str(tmp_path / 'manifest.json')
+    exports = _exports(tmp_path)
+    GeneralUtil.gsheets_to_files(client, exports, manifest_fp=manifest_fp)
+    client.calls.clear()
+
+    status = GeneralUtil.gsheets_to_files(client, exports, manifest_fp=manifest_fp)
+
+    assert set(status.values()) == {'skipped'}
+    # Spreadsheets are still opened to read their modified time, but no values are fetched.
+    assert client.calls == {'open': 2}
+
+
+def test_changed_spreadsheet_is_exported_again(client, tmp_path):
+    manifest_fp = str(tmp_path / 'manifest.json')
+    exports = _exports(tmp_path)
+    GeneralUtil.gsheets_to_files(client, exports, manifest_fp=manifest_fp)
+
+    client.spreadsheets['Roster']['Sheet1'].append(['210071', 'Rumi'])
+    client.touch('Roster')
+    status = GeneralUtil.gsheets_to_files(client, exports, manifest_fp=manifest_fp)
+
+    assert status[str(tmp_path / 'roster.csv')] == 'exported'
+    assert status[str(tmp_path / 'monday.csv')] == 'skipped'
+    assert pd.read_csv(tmp_path / 'roster.csv')['name'].tolist() == ['Makai', 'Rumi']
+
+
+def test_missing_file_is_exported_again(client, tmp_path):
+    manifest_fp = str(tmp_path / 'manifest.json')
+    exports = _exports(tmp_path)
+    GeneralUtil.gsheets_to_files(client, exports, manifest_fp=manifest_fp)
+
+    os.remove(tmp_path / 'bob.csv')
+    status = GeneralUtil.gsheets_to_files(client, exports, manifest_fp=manifest_fp)
+
+    assert status[str(tmp_path / 'bob.csv')] == 'exported'
+    assert status[str(tmp_path / 'monday.csv')] == 'skipped'
+    assert os.path.exists(tmp_path / 'bob.csv')
+
+
+def test_gsheet_to_file_matches_batched_export(client, tmp_path):
+    GeneralUtil.gsheet_to_file(client, str(tmp_path / 'single.csv'), 'Roster', 'Sheet1')
+    GeneralUtil.gsheets_to_files(client, [('Roster', 'Sheet1', str(tmp_path / 'batched.csv'))])
+
+    assert (tmp_path / 'single.csv').read_text() == (tmp_path / 'batched.csv').read_text()
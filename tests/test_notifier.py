@@ -0,0 +1,116 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import base64
+import email
+import socket
+
+import pytest
+
+from general import GeneralUtil
+
+controller = pytest.importorskip('aiosmtpd.controller')
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+class Inbox:
+    """aiosmtpd handler keeping every message it receives."""
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.mail_from, envelope.rcpt_tos, envelope.content))
+        return '250 OK'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    inbox = Inbox()
+    server = controller.Controller(inbox, hostname='127.0.0.1', port=_free_port())
+    server.start()
+    server.inbox = inbox
+    yield server
+    server.stop()
+
+
+def _notifier(server, **kwargs) -> GeneralUtil.Notifier:
+    return GeneralUtil.Notifier(
+        'bot@example.com', None, host=server.hostname, port=server.port, starttls=False, **kwargs
+    )
+
+
+def test_every_send_is_delivered_over_one_connection(smtp_server):
+    with _notifier(smtp_server) as notifier:
+        for _ in range(3):
+            notifier.send('a@example.com', 'Subject: alert\r\n\r\nForm failed')
+        notifier.send_sms({'minh': {'number': 8458200513, 'carrier': 'verizon'}}, 'Form failed')
+
+    assert [rcpt_tos for _, rcpt_tos, _ in smtp_server.inbox.messages] == [
+        ['a@example.com'], ['a@example.com'], ['a@example.com'], ['8458200513@vtext.com'],
+    ]
+    assert notifier.stats == {'sent': 4, 'failed': 0, 'connects': 1}
+
+
+def test_merge_identical_sends_one_transaction(smtp_server):
+    with _notifier(smtp_server, merge_identical=True) as notifier:
+        notifier.send('a@example.com', 'Subject: alert\r\n\r\nForm failed')
+        notifier.send(['a@example.com', 'b@example.com'], 'Subject: alert\r\n\r\nForm failed')
+
+    [(_, rcpt_tos, _)] = smtp_server.inbox.messages
+    assert rcpt_tos == ['a@example.com', 'b@example.com']
+
+
+def test_reconnects_after_server_drop():
+    inbox, port = Inbox(), _free_port()
+    server = controller.Controller(inbox, hostname='127.0.0.1', port=port)
+    server.start()
+    try:
+        with _notifier(server) as notifier:
+            notifier.send('a@example.com', 'Subject: first\r\n\r\n1')
+            notifier.flush()
+            # A restarted server has forgotten the session.
+            server.stop()
+            server = controller.Controller(inbox, hostname='127.0.0.1', port=port)
+            server.start()
+            notifier.send('a@example.com', 'Subject: second\r\n\r\n2')
+    finally:
+        server.stop()
+
+    assert len(inbox.messages) == 2
+    assert notifier.stats['connects'] == 2
+    assert notifier.stats['failed'] == 0
+
+
+def test_email_attachments_are_streamed_intact(smtp_server, tmp_path):
+    data = bytes(range(256)) * 1000
+    attachment_fp = tmp_path / 'report.bin'
+    attachment_fp.write_bytes(data)
+
+    with _notifier(smtp_server) as notifier:
+        notifier.send_email('Report', 'a@example.com', {'body': 'Done', 'attachment': [str(attachment_fp)]})
+
+    [(mail_from, rcpt_tos, content)] = smtp_server.inbox.messages
+    assert (mail_from, rcpt_tos) == ('bot@example.com', ['a@example.com'])
+    msg = email.message_from_bytes(content)
+    body, attachment = msg.get_payload()
+    assert body.get_payload() == 'Done'
+    assert attachment.get_filename() == 'report.bin'
+    assert base64.b64decode(attachment.get_payload()) == data
+
+
+def test_oversized_attachment_is_refused_up_front(smtp_server, tmp_path):
+    attachment_fp = tmp_path / 'big.csv'
+    attachment_fp.write_text('x' * 100)
+
+    with _notifier(smtp_server) as notifier:
+        with pytest.raises(Exception, match='over the 10 bytes limit'):
+            notifier.send_email('Report', 'a@example.com', {'attachment': [str(attachment_fp)]}, max_attachment_bytes=10)
+
+    assert smtp_server.inbox.messages == []
@@ -0,0 +1,100 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import threading
+
+import pytest
+
+from browser import DriverPool
+from scheduler import FormScheduler
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+def test_every_item_runs_once_on_max_workers_browsers(launcher):
+    seen = []
+    lock = threading.Lock()
+
+    def submit(driver, item):
+        with lock:
+            seen.append((driver, item))
+
+    items = [str(id) for id in range(20)]
+    results = FormScheduler(submit, max_workers=3, launcher=launcher).run(items)
+
+    assert [result.item for result in results] == items
+    assert all(result.ok for result in results)
+    assert sorted(item for _, item in seen) == sorted(items)
+    assert len(launcher.drivers) == 3
+    assert all(driver.quit_calls == 1 for driver in launcher.drivers)
+
+
+def test_no_more_browsers_than_items(launcher):
+    FormScheduler(lambda driver, item: None, max_workers=4, launcher=launcher).run(['210072'])
+
+    assert len(launcher.drivers) == 1
+
+
+def test_failed_item_does_not_stop_the_others(launcher):
+    def submit(driver, item):
+        if item == '210071':
+            raise ValueError('bad answer')
+
+    results = FormScheduler(submit, launcher=launcher).run(['210072', '210071', '210029'])
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == 'ValueError: bad answer'
+    assert len(launcher.drivers) == 1
+
+
+def test_crashed_browser_is_swapped_for_a_fresh_one(launcher):
+    def submit(driver, item):
+        if item == '210071':
+            driver.crash()
+            raise ConnectionRefusedError('chromedriver is gone')
+
+    results = FormScheduler(submit, launcher=launcher).run(['210072', '210071', '210029'])
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert len(launcher.drivers) == 2
+    assert all(result.worker == 0 for result in results)
+
+
+def test_items_left_when_no_browser_can_be_relaunched(launcher):
+    def submit(driver, item):
+        if item == '210071':
+            driver.crash()
+            launcher.fail = True
+            raise ConnectionRefusedError('chromedriver is gone')
+
+    results = FormScheduler(submit, launcher=launcher).run(['210072', '210071', '210029'])
+
+    assert [result.ok for result in results] == [True, False, False]
+    assert results[2].worker == 0
+    assert results[2].error == 'Not run, no browser left: RuntimeError: Chrome failed to start'
+    assert all(driver.quit_calls == 1 for driver in launcher.drivers)
+
+
+def test_items_not_run_when_the_pool_does_not_start(launcher):
+    launcher.fail = True
+
+    results = FormScheduler(lambda driver, item: None, max_workers=2, launcher=launcher).run(['210072', '210071'])
+
+    assert not any(result.ok for result in results)
+    assert all(result.worker == -1 for result in results)
+    assert results[0].error.startswith('Not run, no browser left: RuntimeError')
+
+
+def test_shared_pool_is_left_open(launcher):
+    with DriverPool(size=2, launcher=launcher) as pool:
+        scheduler = FormScheduler(lambda driver, item: None, max_workers=4, launcher=launcher)
+        scheduler.run(['210072', '210071', '210029'], pool=pool)
+        scheduler.run(['210143'], pool=pool)
+
+        assert len(launcher.drivers) == 2
+        assert not any(driver.quit_calls for driver in launcher.drivers)
+
+
+def test_max_workers_must_be_positive():
+    with pytest.raises(ValueError):
+        FormScheduler(lambda driver, item: None, max_workers=0)
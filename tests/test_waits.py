@@ -0,0 +1,58 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from waits import PageWaiter
+
+# --------------------------------------------------------------------------------------------------
+# Tests
+# --------------------------------------------------------------------------------------------------
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDriver:
+    """Serves `pages`, a list of (url, body text), moving to the next one on every poll."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.polls = 0
+
+    @property
+    def current_url(self):
+        url, _ = self.pages[min(self.polls, len(self.pages) - 1)]
+        return url
+
+    def find_element(self, by, value):
+        _, text = self.pages[min(self.polls, len(self.pages) - 1)]
+        self.polls += 1
+        return FakeElement(text)
+
+
+def test_submitted_waits_for_the_confirmation_page():
+    driver = FakeDriver([
+        ('https://forms.test/viewform', 'Submit'),
+        ('https://forms.test/viewform', 'Submit'),
+        ('https://forms.test/formResponse', 'Your response has been recorded.'),
+    ])
+    waiter = PageWaiter(driver, timeout=1, poll_frequency=0.01)
+
+    assert waiter.submitted()
+    assert waiter.records[-1].ok
+
+
+def test_submitted_accepts_the_confirmation_text_alone():
+    driver = FakeDriver([('file:///tmp/form.html', 'Your response has been recorded.')])
+
+    assert PageWaiter(driver, timeout=1, poll_frequency=0.01).submitted()
+
+
+def test_submitted_raises_when_the_form_stays_put():
+    driver = FakeDriver([('https://forms.test/viewform', 'Submit\nThis is a required question')])
+    waiter = PageWaiter(driver, timeout=0.1, poll_frequency=0.01)
+
+    with pytest.raises(TimeoutException, match='`confirmation` not shown'):
+        waiter.submitted()
+    assert not waiter.records[-1].ok
@@ -0,0 +1,174 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass
+class Span:
+    """One timed phase of a run."""
+    name: str
+    item: Optional[str]
+    start: float  # Unix time.
+    seconds: float
+    ok: bool
+    thread: str
+
+
+class SpanRecorder:
+    """Thread-safe recorder of timed spans, exported as JSON lines or a Prometheus textfile.
+
+    Spans cost two perf_counter calls and a list append, cheap enough to leave on in every run.
+    Spans of one item, e.g. a student ID, add up to its per-item total.
+
+    Example use:
+
+    spans = SpanRecorder()
+    with spans.span('page_load', item=student_id):
+        driver.get(url)
+    print(spans.summary())
+    spans.export('timings.prom')
+    """
+    def __init__(self, prefix: str = 'form_filling') -> None:
+        """
+        Parameters
+        ----------
+        prefix : str, optional, default 'form_filling'
+            Prefix of the Prometheus metric names.
+        """
+        self.prefix = prefix
+        self.run_start = time.time()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, item: Optional[str] = None) -> Iterator[None]:
+        """Time the body of the with block as span `name`, marked failed if it raises."""
+        start, wall_start = time.perf_counter(), time.time()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.add(name, time.perf_counter() - start, item=item, ok=ok, start=wall_start)
+
+    def add(
+            self,
+            name: str,
+            seconds: float,
+            item: Optional[str] = None,
+            ok: bool = True,
+            start: Optional[float] = None
+        ) -> None:
+        """Record a span timed elsewhere, e.g. a `waits.WaitRecord`."""
+        if start is None:
+            start = time.time() - seconds
+        span = Span(name, item, start, seconds, ok, threading.current_thread().name)
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        """Drop all spans and start a new run, e.g. after exporting one job of a daemon."""
+        with self._lock:
+            self.spans = []
+            self.run_start = time.time()
+
+    def phases(self) -> Dict[str, Dict[str, float]]:
+        """Return count, failures, total and max seconds per span name."""
+        phases = defaultdict(lambda: {'count': 0, 'failures': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+        for span in self._snapshot():
+            phase = phases[span.name]
+            phase['count'] += 1
+            phase['failures'] += not span.ok
+            phase['seconds'] += span.seconds
+            phase['max_seconds'] = max(phase['max_seconds'], span.seconds)
+        return dict(phases)
+
+    def totals(self, name: str = 'total') -> Dict[str, float]:
+        """Return seconds per item of span `name`, by default the whole-item span."""
+        totals = defaultdict(float)
+        for span in self._snapshot():
+            if span.item is not None and span.name == name:
+                totals[span.item] += span.seconds
+        return dict(totals)
+
+    def summary(self) -> str:
+        """Format the phases sorted by the time spent in them."""
+        phases = sorted(self.phases().items(), key=lambda kv: kv[1]['seconds'], reverse=True)
+        lines = [f'{"phase":<24}{"count":>7}{"failed":>8}{"total s":>10}{"max s":>8}']
+        for name, phase in phases:
+            lines.append(
+                f'{name:<24}{phase["count"]:>7}{phase["failures"]:>8}'
+                f'{phase["seconds"]:>10.2f}{phase["max_seconds"]:>8.2f}'
+            )
+        return '\n'.join(lines)
+
+    def export(self, fp: str) -> None:
+        """Write to `fp` as a Prometheus textfile if it ends in .prom, as JSON lines otherwise."""
+        if fp.endswith('.prom'):
+            self.to_prometheus(fp)
+        else:
+            self.to_jsonl(fp)
+
+    def to_jsonl(self, fp: str) -> None:
+        """Append one line per span and one per item total to `fp`.
+
+        Every line carries the start of the run, so a single file can track many runs.
+        """
+        run = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.run_start))
+        with open(fp, 'a') as f:
+            for span in self._snapshot():
+                f.write(json.dumps({'kind': 'span', 'run': run, **asdict(span)}) + '\n')
+            for item, seconds in self.totals().items():
+                f.write(json.dumps({'kind': 'item', 'run': run, 'item': item, 'seconds': seconds}) + '\n')
+
+    def to_prometheus(self, fp: str) -> None:
+        """Write the last run as a textfile for node_exporter's textfile collector.
+
+        The file is replaced atomically so the collector never reads a partial one.
+        """
+        p = self.prefix
+        lines = [
+            f'# HELP {p}_phase_seconds Seconds spent in each phase during the last run.',
+            f'# TYPE {p}_phase_seconds gauge',
+        ]
+        phases = self.phases()
+        for name, phase in phases.items():
+            lines.append(f'{p}_phase_seconds{{phase="{_escape(name)}"}} {phase["seconds"]:.6f}')
+        lines += [f'# HELP {p}_phase_count Spans recorded per phase.', f'# TYPE {p}_phase_count gauge']
+        for name, phase in phases.items():
+            lines.append(f'{p}_phase_count{{phase="{_escape(name)}"}} {phase["count"]}')
+        lines += [f'# HELP {p}_phase_failures Failed spans per phase.', f'# TYPE {p}_phase_failures gauge']
+        for name, phase in phases.items():
+            lines.append(f'{p}_phase_failures{{phase="{_escape(name)}"}} {phase["failures"]}')
+        lines += [f'# HELP {p}_item_seconds Total seconds per item.', f'# TYPE {p}_item_seconds gauge']
+        for item, seconds in self.totals().items():
+            lines.append(f'{p}_item_seconds{{item="{_escape(item)}"}} {seconds:.6f}')
+        lines += [
+            f'# HELP {p}_last_run_timestamp_seconds Start of the last run.',
+            f'# TYPE {p}_last_run_timestamp_seconds gauge',
+            f'{p}_last_run_timestamp_seconds {self.run_start:.0f}',
+        ]
+
+        tmp_fp = f'{fp}.{os.getpid()}.tmp'
+        with open(tmp_fp, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_fp, fp)
+
+    def _snapshot(self) -> List[Span]:
+        with self._lock:
+            return list(self.spans)
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,139 @@
+# --------------------------------------------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------------------------------------------
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# --------------------------------------------------------------------------------------------------
+# Constants
+# --------------------------------------------------------------------------------------------------
+Locator = Tuple[str, str]
+
+FORM_LOCATOR: Locator = (By.TAG_NAME, 'form')
+
+# Google Forms posts to .../formResponse and shows this text once it accepted a response.
+CONFIRMATION_URL = 'formResponse'
+CONFIRMATION_TEXT = 'Your response has been recorded'
+
+# --------------------------------------------------------------------------------------------------
+# Methods
+# --------------------------------------------------------------------------------------------------
+@dataclass
+class WaitRecord:
+    """How long one explicit wait took."""
+    name: str
+    condition: str
+    seconds: float
+    ok: bool
+
+
+class PageWaiter:
+    """Explicit waits on expected conditions that record how long each one took.
+
+    Replaces fixed `time.sleep` calls: every wait returns as soon as its condition holds and
+    only fails after `timeout` seconds.
+
+    Example use:
+
+    waiter = PageWaiter(driver, timeout=10, poll_frequency=0.1)
+    waiter.form_ready()
+    waiter.clickable((By.XPATH, "//span[contains(text(),'Submit')]"), name='submit').click()
+    print(waiter.records)
+    """
+    def __init__(self, driver: webdriver.Chrome, timeout: float = 10, poll_frequency: float = 0.1) -> None:
+        """
+        Parameters
+        ----------
+        timeout : float, optional, default 10
+            Default number of seconds before a wait gives up.
+        poll_frequency : float, optional, default 0.1
+            Seconds between two checks of the condition.
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.records: List[WaitRecord] = []
+
+    def present(self, locator: Locator, name: Optional[str] = None, timeout: Optional[float] = None) -> WebElement:
+        """Wait until an element matching `locator` is in the DOM."""
+        return self._wait(EC.presence_of_element_located(locator), name or locator[1], 'present', timeout)
+
+    def all_present(
+            self,
+            locator: Locator,
+            name: Optional[str] = None,
+            timeout: Optional[float] = None
+        ) -> List[WebElement]:
+        """Wait until at least one element matching `locator` is in the DOM and return them all."""
+        return self._wait(EC.presence_of_all_elements_located(locator), name or locator[1], 'present', timeout)
+
+    def clickable(self, locator: Locator, name: Optional[str] = None, timeout: Optional[float] = None) -> WebElement:
+        """Wait until an element matching `locator` is visible and enabled."""
+        return self._wait(EC.element_to_be_clickable(locator), name or locator[1], 'clickable', timeout)
+
+    def form_ready(
+            self,
+            locator: Locator = FORM_LOCATOR,
+            name: str = 'form',
+            timeout: Optional[float] = None
+        ) -> WebElement:
+        """Wait until the document finished loading and the form element is in the DOM.
+
+        Under the 'eager' page load strategy the DOM being parsed counts as loaded, as waiting
+        for 'complete' would wait for the subresources the strategy means to skip.
+        """
+        if self.driver.capabilities.get('pageLoadStrategy') == 'eager':
+            ready_states = ('interactive', 'complete')
+        else:
+            ready_states = ('complete',)
+
+        def condition(driver):
+            if driver.execute_script('return document.readyState') not in ready_states:
+                return False
+            return EC.presence_of_element_located(locator)(driver)
+        return self._wait(condition, name, 'form ready', timeout)
+
+    def submitted(
+            self,
+            url_part: str = CONFIRMATION_URL,
+            text: str = CONFIRMATION_TEXT,
+            name: str = 'confirmation',
+            timeout: Optional[float] = None
+        ) -> bool:
+        """Wait until the form was accepted, i.e. the URL contains `url_part` or the page shows `text`.
+
+        A click on submit returns whether or not the form took the response. A form that stays
+        put, e.g. showing "This is a required question", makes this raise a TimeoutException.
+        """
+        text_shown = EC.text_to_be_present_in_element((By.TAG_NAME, 'body'), text)
+
+        def condition(driver):
+            return url_part in driver.current_url or text_shown(driver)
+        return self._wait(condition, name, 'shown', timeout)
+
+    def until(self, condition: Callable, name: str, kind: str = 'ready', timeout: Optional[float] = None):
+        """Wait until `condition(driver)` returns something truthy and return it."""
+        return self._wait(condition, name, kind, timeout)
+
+    def total(self) -> float:
+        """Seconds spent waiting across all recorded waits."""
+        return sum(record.seconds for record in self.records)
+
+    def _wait(self, condition: Callable, name: str, kind: str, timeout: Optional[float]):
+        timeout = self.timeout if timeout is None else timeout
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency)
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = wait.until(condition, message=f'`{name}` not {kind} after {timeout} seconds.')
+            ok = True
+            return result
+        finally:
+            self.records.append(WaitRecord(name, kind, time.perf_counter() - start, ok))